@@ -1,25 +1,19 @@
 from datetime import datetime, timedelta
 from collections import defaultdict
+from heapq import nlargest
+from operator import attrgetter
+from typing import NamedTuple
 from rich.console import Console
 
 # Import necessary components from other features
-from features.transactions.transactions import load_transactions, Transaction, from_paisa
+from features.transactions.transactions import (
+    load_transactions, sort_transactions_by_date, filter_transactions_by_month,
+    Transaction, from_paisa, format_paisa
+)
 from features.budgets.budgets import load_budgets, Budget
 
 console = Console()
 
-def filter_transactions_by_month(
-    transactions: list[Transaction], 
-    year: int, 
-    month: int
-) -> list[Transaction]:
-    """Filters transactions for a specific year and month."""
-    return [
-        t for t in transactions 
-        if datetime.strptime(t.date, "%Y-%m-%d").year == year and 
-           datetime.strptime(t.date, "%Y-%m-%d").month == month
-    ]
-
 def get_monthly_spending_by_category(
     transactions: list[Transaction]
 ) -> dict[str, int]:
@@ -40,13 +34,149 @@ def get_monthly_income_by_source(
             income_by_source[t.category] += t.amount
     return income_by_source
 
+def compute_category_spending(
+    transactions: list[Transaction],
+    budget_categories: frozenset[str],
+    month_str: str
+) -> dict[str, int]:
+    """
+    Returns a month's expenses for each budgeted category.
+    month_str is a 'YYYY-MM' string; every budgeted category is present in
+    the result, with 0 when nothing was spent. Totals are read from the cached
+    monthly aggregates, so repeated calls on the same list do not rescan it.
+    """
+    monthly = get_monthly_aggregates(transactions)
+    month_key = (int(month_str[:4]), int(month_str[5:7]))
+    # .get() keeps absent months/categories from being inserted as empty entries
+    spending = monthly[month_key]["by_cat_expense"] if month_key in monthly else {}
+    return {category: spending.get(category, 0) for category in budget_categories}
+
+def current_month_category_spending(
+    budgets: list[Budget],
+    transactions: list[Transaction] | None = None,
+    today: datetime | None = None
+) -> dict[str, int]:
+    """
+    Returns the current month's expenses for each budgeted category.
+    Transactions are loaded when not given; the load and monthly aggregation
+    caches mean repeated calls between file writes scan them only once.
+    """
+    all_transactions = (
+        sort_transactions_by_date(transactions) if transactions is not None else load_transactions()
+    )
+    today = today or datetime.now()
+    return compute_category_spending(
+        all_transactions,
+        frozenset(budget.category for budget in budgets),
+        today.strftime("%Y-%m")
+    )
+
+def _new_month_bucket() -> dict:
+    """Creates an empty per-month aggregation bucket."""
+    return {
+        "expense": 0,
+        "income": 0,
+        "by_cat_expense": defaultdict(int),
+        "by_cat_income": defaultdict(int),
+    }
+
+def aggregate_by_month(
+    transactions: list[Transaction]
+) -> dict[tuple[int, int], dict]:
+    """
+    Aggregates transactions into per-month buckets in a single pass.
+    Keys are (year, month) tuples; each bucket holds expense/income totals
+    and per-category breakdowns. Months without transactions yield empty buckets.
+    """
+    # Bucket on the raw 'YYYY-MM' prefix so the per-row work stays a slice and
+    # a dict lookup; the prefix is only converted to (year, month) per bucket.
+    by_prefix = defaultdict(_new_month_bucket)
+    for t in transactions:
+        bucket = by_prefix[t.date[:7]]
+        amount = t.amount
+        if t.type == "expense":
+            bucket["expense"] += amount
+            bucket["by_cat_expense"][t.category] += amount
+        elif t.type == "income":
+            bucket["income"] += amount
+            bucket["by_cat_income"][t.category] += amount
+
+    monthly = defaultdict(_new_month_bucket)
+    for prefix, bucket in by_prefix.items():
+        monthly[(int(prefix[:4]), int(prefix[5:7]))] = bucket
+    return monthly
+
+# Monthly aggregates of the most recently aggregated transaction list
+_monthly_aggregates_cache = {"transactions": None, "monthly": None}
+
+def get_monthly_aggregates(
+    transactions: list[Transaction]
+) -> dict[tuple[int, int], dict]:
+    """
+    Returns aggregate_by_month for the given list, reusing the previous result
+    when called again with the same list object. load_transactions hands out a
+    shared list until the file changes, so every analysis run against the same
+    data aggregates it only once.
+    """
+    if _monthly_aggregates_cache["transactions"] is not transactions:
+        _monthly_aggregates_cache["monthly"] = aggregate_by_month(transactions)
+        _monthly_aggregates_cache["transactions"] = transactions
+    return _monthly_aggregates_cache["monthly"]
+
+def get_recent_months(today: datetime, count: int) -> list[tuple[int, int]]:
+    """Returns (year, month) pairs for the current month and the months before it, newest first."""
+    months = []
+    month_start = today.replace(day=1)
+    for _ in range(count):
+        months.append((month_start.year, month_start.month))
+        # Step back to the first day of the previous calendar month
+        month_start = (month_start - timedelta(days=1)).replace(day=1)
+    return months
+
+class ReportContext(NamedTuple):
+    """Date values shared by the analyses, derived once from the current time."""
+    today: datetime
+    current_month: tuple[int, int] # (year, month)
+    current_month_str: str # 'YYYY-MM'
+    last_month: tuple[int, int]
+    last_month_str: str
+    days_so_far: int # days elapsed in the current month, including today
+    trend_months: list[tuple[int, int]] # last 3 months including current, newest first
+
+def get_report_context(today: datetime | None = None) -> ReportContext:
+    """Builds a ReportContext for the given moment (defaults to now)."""
+    if today is None:
+        today = datetime.now()
+    trend_months = get_recent_months(today, 3)
+    last_year, last_month = trend_months[1]
+    return ReportContext(
+        today=today,
+        current_month=trend_months[0],
+        current_month_str=f"{today.year:04d}-{today.month:02d}",
+        last_month=trend_months[1],
+        last_month_str=f"{last_year:04d}-{last_month:02d}",
+        days_so_far=today.day,
+        trend_months=trend_months,
+    )
+
 def get_total_spending(transactions: list[Transaction]) -> int:
     """Calculates total spending from a list of transactions."""
-    return sum(t.amount for t in transactions if t.type == "expense")
+    return sum([t.amount for t in transactions if t.type == "expense"])
 
 def get_total_income(transactions: list[Transaction]) -> int:
     """Calculates total income from a list of transactions."""
-    return sum(t.amount for t in transactions if t.type == "income")
+    return sum([t.amount for t in transactions if t.type == "income"])
+
+def get_income_and_spending(transactions: list[Transaction]) -> tuple[int, int]:
+    """Calculates total income and total spending in a single pass."""
+    total_income = 0
+    total_spending = 0
+    for t in transactions:
+        if t.type == "expense":
+            total_spending += t.amount
+        elif t.type == "income":
+            total_income += t.amount
+    return total_income, total_spending
 
 from rich.table import Table
 
@@ -59,170 +189,67 @@ def generate_pie_chart_ascii(data: dict[str, int], title: str = "Distribution")
     if total == 0:
         return "[yellow]No data to display for pie chart (total is zero).[/yellow]"
 
-    chart = f"[bold]{title}[/bold]\n"
     sorted_data = sorted(data.items(), key=lambda item: item[1], reverse=True)
     
     max_label_length = max(len(label) for label, _ in sorted_data)
 
+    lines = [f"[bold]{title}[/bold]"]
     for label, value in sorted_data:
-        percentage = (value / total) * 100
-        # Scale bar length to fit in a reasonable console width
-        bar_length = int(percentage / 100 * 20)  # Max 20 characters for the bar
-        bar = "█" * bar_length
-        chart += f"{label.ljust(max_label_length)} {bar} {percentage:.0f}%\n"
-    return chart
-
-def spending_analysis():
-    """Provides an analysis of spending patterns."""
+        percentage = value * 100 / total
+        # Scale bar length to fit in a reasonable console width (integer math, max 20 characters)
+        bar = "█" * (value * 20 // total)
+        lines.append(f"{label.ljust(max_label_length)} {bar} {percentage:.0f}%")
+    return "\n".join(lines) + "\n"
+
+def spending_analysis(transactions: list[Transaction] | None = None):
+    """
+    Provides an analysis of spending patterns.
+    Given transactions are sorted by date first if they aren't already.
+    """
     console.print("\n[bold blue]Spending Analysis[/bold blue]")
 
-    all_transactions = load_transactions()
-    if not all_transactions:
-        console.print("[yellow]No transactions to analyze.[/yellow]")
-        return
-
-    today = datetime.now()
-    current_month_year = (today.year, today.month)
-    last_month_date = today.replace(day=1) - timedelta(days=1)
-    last_month_year = (last_month_date.year, last_month_date.month)
-
-    current_month_transactions = filter_transactions_by_month(
-        all_transactions, current_month_year[0], current_month_year[1]
+    all_transactions = (
+        sort_transactions_by_date(transactions) if transactions is not None else load_transactions()
     )
-    last_month_transactions = filter_transactions_by_month(
-        all_transactions, last_month_year[0], last_month_year[1]
-    )
-
-    # --- Current Month Spending ---
-    console.print(f"\n[bold underline]Current Month ({today.strftime('%Y-%m')}) Spending:[/bold underline]")
-    current_month_spending_by_category = get_monthly_spending_by_category(current_month_transactions)
-    total_current_month_spending = sum(current_month_spending_by_category.values())
-
-    console.print(generate_pie_chart_ascii(
-        {k: v for k,v in current_month_spending_by_category.items()}, 
-        "Spending by Category"
-    ))
-
-    if current_month_spending_by_category:
-        sorted_spending = sorted(
-            current_month_spending_by_category.items(), 
-            key=lambda item: item[1], 
-            reverse=True
-        )
-        console.print("\n[bold]Top 3 Spending Categories:[/bold]")
-        for category, amount in sorted_spending[:3]:
-            console.print(f"- {category}: {from_paisa(amount):.2f}")
-    
-    if current_month_transactions:
-        # Calculate average daily expense for current month
-        first_day_of_month = today.replace(day=1)
-        days_in_month_so_far = (today - first_day_of_month).days + 1
-        avg_daily_expense = total_current_month_spending / days_in_month_so_far
-        console.print(f"\n[bold]Average Daily Expense (current month):[/bold] {from_paisa(avg_daily_expense):.2f}")
-
-    # --- Comparison with Last Month ---
-    console.print(f"\n[bold underline]Comparison with Last Month ({last_month_date.strftime('%Y-%m')}):[/bold underline]")
-    total_last_month_spending = get_total_spending(last_month_transactions)
-
-    console.print(f"Current Month Total Spending: {from_paisa(total_current_month_spending):.2f}")
-    console.print(f"Last Month Total Spending: {from_paisa(total_last_month_spending):.2f}")
-
-    if total_last_month_spending > 0:
-        change_percent = ((total_current_month_spending - total_last_month_spending) / total_last_month_spending) * 100
-        if change_percent > 0:
-            console.print(f"[red]Spending increased by {change_percent:.2f}%[/red] compared to last month.")
-        elif change_percent < 0:
-            console.print(f"[green]Spending decreased by {abs(change_percent):.2f}%[/green] compared to last month.")
-        else:
-            console.print("[blue]Spending remained the same[/blue] as last month.")
-    else:
-        if total_current_month_spending > 0:
-            console.print("[red]No spending last month, but spending in current month.[/red]")
-        else:
-            console.print("[blue]No spending in either month.[/blue]")
-
-    # --- Spending Trends (Simplified) ---
-    console.print("\n[bold underline]Spending Trends (last 3 months):[/bold underline]")
-    trend_months = []
-    trend_spending = []
-
-    for i in range(3): # Last 3 months including current
-        month_date = (today.replace(day=1) - timedelta(days=30*i)) 
-        m_transactions = filter_transactions_by_month(
-            all_transactions, month_date.year, month_date.month
-        )
-        total_m_spending = get_total_spending(m_transactions)
-        trend_months.append(month_date.strftime("%Y-%m"))
-        trend_spending.append(total_m_spending)
-    
-    # Reverse to show oldest to newest
-    trend_months.reverse()
-    trend_spending.reverse()
-
-    console.print(f"Spending over last 3 months: {', '.join([f'{m}: {from_paisa(s):.2f}' for m, s in zip(trend_months, trend_spending)])}")
-    
-    if len(trend_spending) >= 2:
-        if trend_spending[-1] > trend_spending[-2]:
-            console.print("[red]Overall spending trend: UPWARD[/red]")
-        elif trend_spending[-1] < trend_spending[-2]:
-            console.print("[green]Overall spending trend: DOWNWARD[/green]")
-        else:
-            console.print("[blue]Overall spending trend: STABLE[/blue]")
-        
-def spending_analysis():
-    """Provides an analysis of spending patterns."""
-    console.print("\n[bold blue]Spending Analysis[/bold blue]")
-
-    all_transactions = load_transactions()
     if not all_transactions:
         console.print("[yellow]No transactions to analyze.[/yellow]")
         return
 
-    today = datetime.now()
-    current_month_year = (today.year, today.month)
-    last_month_date = today.replace(day=1) - timedelta(days=1)
-    last_month_year = (last_month_date.year, last_month_date.month)
-
-    current_month_transactions = filter_transactions_by_month(
-        all_transactions, current_month_year[0], current_month_year[1]
-    )
-    last_month_transactions = filter_transactions_by_month(
-        all_transactions, last_month_year[0], last_month_year[1]
-    )
+    ctx = get_report_context()
+    current_month_transactions = filter_transactions_by_month(all_transactions, *ctx.current_month)
+    monthly = get_monthly_aggregates(all_transactions)
 
     # --- Current Month Spending ---
-    console.print(f"\n[bold underline]Current Month ({today.strftime('%Y-%m')}) Spending:[/bold underline]")
-    current_month_spending_by_category = get_monthly_spending_by_category(current_month_transactions)
-    total_current_month_spending = sum(current_month_spending_by_category.values())
+    console.print(f"\n[bold underline]Current Month ({ctx.current_month_str}) Spending:[/bold underline]")
+    current_month_spending_by_category = monthly[ctx.current_month]["by_cat_expense"]
+    total_current_month_spending = monthly[ctx.current_month]["expense"]
 
     console.print(generate_pie_chart_ascii(
-        {k: v for k,v in current_month_spending_by_category.items()}, 
+        current_month_spending_by_category,
         "Spending by Category"
     ))
 
     if current_month_spending_by_category:
-        sorted_spending = sorted(
-            current_month_spending_by_category.items(), 
-            key=lambda item: item[1], 
-            reverse=True
+        top_spending = nlargest(
+            3,
+            current_month_spending_by_category.items(),
+            key=lambda item: item[1]
         )
         console.print("\n[bold]Top 3 Spending Categories:[/bold]")
-        for category, amount in sorted_spending[:3]:
-            console.print(f"- {category}: {from_paisa(amount):.2f}")
+        for category, amount in top_spending:
+            console.print(f"- {category}: {format_paisa(amount)}")
     
     if current_month_transactions:
         # Calculate average daily expense for current month
-        first_day_of_month = today.replace(day=1)
-        days_in_month_so_far = (today - first_day_of_month).days + 1
-        avg_daily_expense = total_current_month_spending / days_in_month_so_far
+        avg_daily_expense = total_current_month_spending / ctx.days_so_far
         console.print(f"\n[bold]Average Daily Expense (current month):[/bold] {from_paisa(avg_daily_expense):.2f}")
 
     # --- Comparison with Last Month ---
-    console.print(f"\n[bold underline]Comparison with Last Month ({last_month_date.strftime('%Y-%m')}):[/bold underline]")
-    total_last_month_spending = get_total_spending(last_month_transactions)
+    console.print(f"\n[bold underline]Comparison with Last Month ({ctx.last_month_str}):[/bold underline]")
+    total_last_month_spending = monthly[ctx.last_month]["expense"]
 
-    console.print(f"Current Month Total Spending: {from_paisa(total_current_month_spending):.2f}")
-    console.print(f"Last Month Total Spending: {from_paisa(total_last_month_spending):.2f}")
+    console.print(f"Current Month Total Spending: {format_paisa(total_current_month_spending)}")
+    console.print(f"Last Month Total Spending: {format_paisa(total_last_month_spending)}")
 
     if total_last_month_spending > 0:
         change_percent = ((total_current_month_spending - total_last_month_spending) / total_last_month_spending) * 100
@@ -243,20 +270,16 @@ def spending_analysis():
     trend_months = []
     trend_spending = []
 
-    for i in range(3): # Last 3 months including current
-        month_date = (today.replace(day=1) - timedelta(days=30*i)) 
-        m_transactions = filter_transactions_by_month(
-            all_transactions, month_date.year, month_date.month
-        )
-        total_m_spending = get_total_spending(m_transactions)
-        trend_months.append(month_date.strftime("%Y-%m"))
+    for year, month in ctx.trend_months: # Last 3 months including current
+        total_m_spending = monthly[(year, month)]["expense"]
+        trend_months.append(f"{year:04d}-{month:02d}")
         trend_spending.append(total_m_spending)
     
     # Reverse to show oldest to newest
     trend_months.reverse()
     trend_spending.reverse()
 
-    console.print(f"Spending over last 3 months: {', '.join([f'{m}: {from_paisa(s):.2f}' for m, s in zip(trend_months, trend_spending)])}")
+    console.print(f"Spending over last 3 months: {', '.join([f'{m}: {format_paisa(s)}' for m, s in zip(trend_months, trend_spending)])}")
     
     if len(trend_spending) >= 2:
         if trend_spending[-1] > trend_spending[-2]:
@@ -265,46 +288,39 @@ def spending_analysis():
             console.print("[green]Overall spending trend: DOWNWARD[/green]")
         else:
             console.print("[blue]Overall spending trend: STABLE[/blue]")
-def income_analysis():
+def income_analysis(transactions: list[Transaction] | None = None):
     """Provides an analysis of income patterns."""
     console.print("\n[bold blue]Income Analysis[/bold blue]")
 
-    all_transactions = load_transactions()
+    all_transactions = (
+        sort_transactions_by_date(transactions) if transactions is not None else load_transactions()
+    )
     if not all_transactions:
         console.print("[yellow]No transactions to analyze.[/yellow]")
         return
 
-    today = datetime.now()
-    current_month_year = (today.year, today.month)
-    last_month_date = today.replace(day=1) - timedelta(days=1)
-    last_month_year = (last_month_date.year, last_month_date.month)
-
-    current_month_transactions = filter_transactions_by_month(
-        all_transactions, current_month_year[0], current_month_year[1]
-    )
-    last_month_transactions = filter_transactions_by_month(
-        all_transactions, last_month_year[0], last_month_year[1]
-    )
+    ctx = get_report_context()
+    monthly = get_monthly_aggregates(all_transactions)
 
     # --- Current Month Income ---
-    console.print(f"\n[bold underline]Current Month ({today.strftime('%Y-%m')}) Income:[/bold underline]")
-    current_month_income_by_source = get_monthly_income_by_source(current_month_transactions)
-    total_current_month_income = sum(current_month_income_by_source.values())
+    console.print(f"\n[bold underline]Current Month ({ctx.current_month_str}) Income:[/bold underline]")
+    current_month_income_by_source = monthly[ctx.current_month]["by_cat_income"]
+    total_current_month_income = monthly[ctx.current_month]["income"]
 
     if current_month_income_by_source:
         for source, amount in current_month_income_by_source.items():
-            console.print(f"- {source}: {from_paisa(amount):.2f}")
+            console.print(f"- {source}: {format_paisa(amount)}")
     else:
         console.print("[yellow]No income recorded for the current month.[/yellow]")
     
-    console.print(f"\n[bold]Total Income (current month):[/bold] {from_paisa(total_current_month_income):.2f}")
+    console.print(f"\n[bold]Total Income (current month):[/bold] {format_paisa(total_current_month_income)}")
 
     # --- Comparison with Last Month ---
-    console.print(f"\n[bold underline]Comparison with Last Month ({last_month_date.strftime('%Y-%m')}):[/bold underline]")
-    total_last_month_income = get_total_income(last_month_transactions)
+    console.print(f"\n[bold underline]Comparison with Last Month ({ctx.last_month_str}):[/bold underline]")
+    total_last_month_income = monthly[ctx.last_month]["income"]
 
-    console.print(f"Current Month Total Income: {from_paisa(total_current_month_income):.2f}")
-    console.print(f"Last Month Total Income: {from_paisa(total_last_month_income):.2f}")
+    console.print(f"Current Month Total Income: {format_paisa(total_current_month_income)}")
+    console.print(f"Last Month Total Income: {format_paisa(total_last_month_income)}")
 
     if total_last_month_income > 0:
         change_percent = ((total_current_month_income - total_last_month_income) / total_last_month_income) * 100
@@ -323,10 +339,8 @@ def income_analysis():
     # --- Income Stability (Simplified: Check consistency over last 3 months) ---
     console.print("\n[bold underline]Income Stability (last 3 months):[/bold underline]")
     income_over_months = []
-    for i in range(3):
-        month_date = (today.replace(day=1) - timedelta(days=30*i))
-        m_transactions = filter_transactions_by_month(all_transactions, month_date.year, month_date.month)
-        income_over_months.append(get_total_income(m_transactions))
+    for year, month in ctx.trend_months:
+        income_over_months.append(monthly[(year, month)]["income"])
     
     # Reverse to show oldest to newest
     income_over_months.reverse()
@@ -341,47 +355,47 @@ def income_analysis():
         console.print("[yellow]Not enough data to assess income stability over 3 months.[/yellow]")
     else:
         console.print("[yellow]No income data available.[/yellow]")
-def savings_analysis():
+def savings_analysis(transactions: list[Transaction] | None = None):
     """Provides an analysis of savings patterns."""
     console.print("\n[bold blue]Savings Analysis[/bold blue]")
 
-    all_transactions = load_transactions()
+    all_transactions = (
+        sort_transactions_by_date(transactions) if transactions is not None else load_transactions()
+    )
     if not all_transactions:
         console.print("[yellow]No transactions to analyze.[/yellow]")
         return
 
-    today = datetime.now()
+    ctx = get_report_context()
+    monthly = get_monthly_aggregates(all_transactions)
     
     # --- Current Month Savings ---
-    console.print(f"\n[bold underline]Current Month ({today.strftime('%Y-%m')}) Savings:[/bold underline]")
-    current_month_transactions = filter_transactions_by_month(all_transactions, today.year, today.month)
-    total_current_month_income = get_total_income(current_month_transactions)
-    total_current_month_spending = get_total_spending(current_month_transactions)
+    console.print(f"\n[bold underline]Current Month ({ctx.current_month_str}) Savings:[/bold underline]")
+    current_month_totals = monthly[ctx.current_month]
+    total_current_month_income = current_month_totals["income"]
+    total_current_month_spending = current_month_totals["expense"]
 
     monthly_savings = total_current_month_income - total_current_month_spending
     savings_rate = (monthly_savings / total_current_month_income * 100) if total_current_month_income > 0 else 0
 
-    console.print(f"Total Income: {from_paisa(total_current_month_income):.2f}")
-    console.print(f"Total Spending: {from_paisa(total_current_month_spending):.2f}")
-    console.print(f"Monthly Savings: {from_paisa(monthly_savings):.2f}")
+    console.print(f"Total Income: {format_paisa(total_current_month_income)}")
+    console.print(f"Total Spending: {format_paisa(total_current_month_spending)}")
+    console.print(f"Monthly Savings: {format_paisa(monthly_savings)}")
     console.print(f"Savings Rate: {savings_rate:.2f}%")
 
     # --- Savings Trend (last 3 months) ---
     console.print("\n[bold underline]Savings Trend (last 3 months):[/bold underline]")
     savings_over_months = []
-    for i in range(3):
-        month_date = (today.replace(day=1) - timedelta(days=30*i))
-        m_transactions = filter_transactions_by_month(all_transactions, month_date.year, month_date.month)
-        m_income = get_total_income(m_transactions)
-        m_spending = get_total_spending(m_transactions)
-        m_savings = m_income - m_spending
-        savings_over_months.append((month_date.strftime("%Y-%m"), m_savings))
+    for year, month in ctx.trend_months:
+        month_totals = monthly[(year, month)]
+        m_savings = month_totals["income"] - month_totals["expense"]
+        savings_over_months.append((f"{year:04d}-{month:02d}", m_savings))
     
     # Reverse to show oldest to newest
     savings_over_months.reverse()
 
     for month_str, savings_amount in savings_over_months:
-        console.print(f"- {month_str}: {from_paisa(savings_amount):.2f}")
+        console.print(f"- {month_str}: {format_paisa(savings_amount)}")
     
     if len(savings_over_months) >= 2:
         latest_savings = savings_over_months[-1][1]
@@ -394,22 +408,26 @@ def savings_analysis():
         else:
             console.print("[blue]Savings trend: STABLE[/blue]")
 
-def financial_health_score():
-    """Calculates and displays a financial health score."""
+def financial_health_score(transactions: list[Transaction] | None = None):
+    """
+    Calculates and displays a financial health score.
+    Given transactions are sorted by date first if they aren't already.
+    """
     console.print("\n[bold blue]Financial Health Score[/bold blue]")
 
-    all_transactions = load_transactions()
+    all_transactions = (
+        sort_transactions_by_date(transactions) if transactions is not None else load_transactions()
+    )
     all_budgets = load_budgets()
 
     if not all_transactions:
         console.print("[yellow]No transactions available to calculate health score.[/yellow]")
         return
 
-    today = datetime.now()
-    current_month_transactions = filter_transactions_by_month(all_transactions, today.year, today.month)
+    ctx = get_report_context()
+    current_month_transactions = filter_transactions_by_month(all_transactions, *ctx.current_month)
     
-    total_income_cm = get_total_income(current_month_transactions)
-    total_spending_cm = get_total_spending(current_month_transactions)
+    total_income_cm, total_spending_cm = get_income_and_spending(current_month_transactions)
 
     # --- Score Calculation ---
     score = 0
@@ -435,12 +453,9 @@ def financial_health_score():
     # 2. Budget Adherence (25 points)
     budget_adherence_score = 25
     if all_budgets:
-        current_month_str = today.strftime("%Y-%m")
-        category_spending = {budget.category: 0 for budget in all_budgets}
-        for t in all_transactions:
-            if t.date.startswith(current_month_str) and t.type == "expense":
-                if t.category in category_spending:
-                    category_spending[t.category] += t.amount
+        category_spending = compute_category_spending(
+            all_transactions, frozenset(budget.category for budget in all_budgets), ctx.current_month_str
+        )
         
         over_budget_count = 0
         for budget in all_budgets:
@@ -503,46 +518,52 @@ def financial_health_score():
     if "Income vs Expenses" in score_breakdown and total_income_cm < total_spending_cm:
         console.print("[yellow]- Recommendation: Look for ways to increase your income or significantly reduce your expenses to achieve a positive cash flow.[/yellow]")
 
-def generate_monthly_report():
-    """Generates a comprehensive monthly financial report."""
+def generate_monthly_report(transactions: list[Transaction] | None = None):
+    """
+    Generates a comprehensive monthly financial report.
+    Given transactions are sorted by date first if they aren't already.
+    """
     console.print("\n[bold magenta]Comprehensive Monthly Financial Report[/bold magenta]")
 
-    all_transactions = load_transactions()
+    all_transactions = (
+        sort_transactions_by_date(transactions) if transactions is not None else load_transactions()
+    )
     all_budgets = load_budgets()
 
     if not all_transactions and not all_budgets:
         console.print("[yellow]No data available to generate a report.[/yellow]")
         return
     
-    today = datetime.now()
-    current_month_str = today.strftime("%Y-%m")
-    current_month_transactions = filter_transactions_by_month(all_transactions, today.year, today.month)
+    ctx = get_report_context()
+    current_month_transactions = filter_transactions_by_month(all_transactions, *ctx.current_month)
+    # Totals and both category breakdowns for the month come from one pass
+    current_month = aggregate_by_month(current_month_transactions)[ctx.current_month]
 
     # --- Month Overview ---
-    console.print(f"\n[bold underline]1. Month Overview ({current_month_str})[/bold underline]")
-    total_income_cm = get_total_income(current_month_transactions)
-    total_spending_cm = get_total_spending(current_month_transactions)
+    console.print(f"\n[bold underline]1. Month Overview ({ctx.current_month_str})[/bold underline]")
+    total_income_cm = current_month["income"]
+    total_spending_cm = current_month["expense"]
     net_flow = total_income_cm - total_spending_cm
     
-    console.print(f"  Total Income: {from_paisa(total_income_cm):.2f}")
-    console.print(f"  Total Expenses: {from_paisa(total_spending_cm):.2f}")
-    console.print(f"  Net Cash Flow: [{ 'green' if net_flow >= 0 else 'red' }]{from_paisa(net_flow):.2f}[/]")
+    console.print(f"  Total Income: {format_paisa(total_income_cm)}")
+    console.print(f"  Total Expenses: {format_paisa(total_spending_cm)}")
+    console.print(f"  Net Cash Flow: [{ 'green' if net_flow >= 0 else 'red' }]{format_paisa(net_flow)}[/]")
 
     # --- Income Summary ---
     console.print(f"\n[bold underline]2. Income Summary[/bold underline]")
-    income_by_source_cm = get_monthly_income_by_source(current_month_transactions)
+    income_by_source_cm = current_month["by_cat_income"]
     if income_by_source_cm:
         for source, amount in income_by_source_cm.items():
-            console.print(f"  - {source}: {from_paisa(amount):.2f}")
+            console.print(f"  - {source}: {format_paisa(amount)}")
     else:
         console.print("  No income recorded this month.")
 
     # --- Expense Summary ---
     console.print(f"\n[bold underline]3. Expense Summary[/bold underline]")
-    spending_by_category_cm = get_monthly_spending_by_category(current_month_transactions)
+    spending_by_category_cm = current_month["by_cat_expense"]
     if spending_by_category_cm:
         for category, amount in spending_by_category_cm.items():
-            console.print(f"  - {category}: {from_paisa(amount):.2f}")
+            console.print(f"  - {category}: {format_paisa(amount)}")
     else:
         console.print("  No expenses recorded this month.")
     
@@ -553,11 +574,10 @@ def generate_monthly_report():
     # --- Budget Performance ---
     console.print(f"\n[bold underline]4. Budget Performance[/bold underline]")
     if all_budgets:
-        category_spending = {budget.category: 0 for budget in all_budgets}
-        for t in all_transactions: # Use all transactions for consistent comparison with budgets
-            if t.date.startswith(current_month_str) and t.type == "expense":
-                if t.category in category_spending:
-                    category_spending[t.category] += t.amount
+        # Use all transactions for consistent comparison with budgets
+        category_spending = compute_category_spending(
+            all_transactions, frozenset(budget.category for budget in all_budgets), ctx.current_month_str
+        )
         
         budget_table = Table(title="Budget vs. Actual")
         budget_table.add_column("Category")
@@ -583,8 +603,8 @@ def generate_monthly_report():
             
             budget_table.add_row(
                 budget.category,
-                f"{from_paisa(budget.amount):.2f}",
-                f"{from_paisa(spent):.2f}",
+                f"{format_paisa(budget.amount)}",
+                f"{format_paisa(spent)}",
                 f"[{status_style}]{status_text}[/{status_style}]"
             )
         console.print(budget_table)
@@ -599,30 +619,28 @@ def generate_monthly_report():
     console.print(f"\n[bold underline]5. Savings Achieved[/bold underline]")
     monthly_savings = total_income_cm - total_spending_cm
     savings_rate = (monthly_savings / total_income_cm * 100) if total_income_cm > 0 else 0
-    console.print(f"  Monthly Savings: {from_paisa(monthly_savings):.2f}")
+    console.print(f"  Monthly Savings: {format_paisa(monthly_savings)}")
     console.print(f"  Savings Rate: {savings_rate:.2f}%")
 
     # --- Top Transactions (Expenses) ---
     console.print(f"\n[bold underline]6. Top Expenses[/bold underline]")
-    top_expenses = sorted(
-        [t for t in current_month_transactions if t.type == "expense"],
-        key=lambda t: t.amount,
-        reverse=True
-    )[:5] # Top 5 expenses
+    top_expenses = nlargest(
+        5, # Top 5 expenses
+        (t for t in current_month_transactions if t.type == "expense"),
+        key=attrgetter("amount")
+    )
 
     if top_expenses:
         for i, t in enumerate(top_expenses):
-            console.print(f"  {i+1}. {t.description} ({t.category}) - {from_paisa(t.amount):.2f}")
+            console.print(f"  {i+1}. {t.description} ({t.category}) - {format_paisa(t.amount)}")
     else:
         console.print("  No expenses recorded this month.")
     
     # --- Trends (Brief Summary) ---
     console.print(f"\n[bold underline]7. Trends Summary[/bold underline]")
     # Re-using logic from spending and income analysis, simplifying
-    last_month_date = today.replace(day=1) - timedelta(days=1)
-    last_month_transactions = filter_transactions_by_month(all_transactions, last_month_date.year, last_month_date.month)
-    total_last_month_spending = get_total_spending(last_month_transactions)
-    total_last_month_income = get_total_income(last_month_transactions)
+    last_month_transactions = filter_transactions_by_month(all_transactions, *ctx.last_month)
+    total_last_month_income, total_last_month_spending = get_income_and_spending(last_month_transactions)
 
     if total_last_month_spending > 0:
         spending_change = ((total_spending_cm - total_last_month_spending) / total_last_month_spending) * 100
@@ -648,7 +666,7 @@ def generate_monthly_report():
     console.print(f"\n[bold underline]8. Next Month Projections[/bold underline]")
     if total_income_cm > 0 and total_spending_cm > 0:
         projected_net_flow = total_income_cm - total_spending_cm # Simple projection based on current month
-        console.print(f"  Based on current trends, projected net cash flow next month: {from_paisa(projected_net_flow):.2f}")
+        console.print(f"  Based on current trends, projected net cash flow next month: {format_paisa(projected_net_flow)}")
     else:
         console.print("  Not enough data to provide a projection.")
 
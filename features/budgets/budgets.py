@@ -1,11 +1,12 @@
 import os
+import sys
 from typing import NamedTuple
 from rich.console import Console
 import questionary # Added this import
 
 # Import necessary components from transactions feature
 from features.transactions.transactions import (
-    to_paisa, from_paisa, EXPENSE_CATEGORIES, get_valid_amount, get_category_choice
+    to_paisa, format_paisa, EXPENSE_CATEGORIES, get_valid_amount, get_category_choice
 )
 
 console = Console()
@@ -16,24 +17,45 @@ class Budget(NamedTuple):
     category: str
     amount: int # stored in paisa
 
+# Parsed budgets are reused until the file changes on disk
+_budgets_cache = {"key": None, "budgets": []}
+
 def load_budgets() -> list[Budget]:
-    """Loads budgets from the budgets file."""
+    """
+    Loads budgets from the budgets file.
+    The parsed list is cached and shared between callers until the file's
+    modification time or size changes, so callers must not mutate it.
+    """
+    try:
+        stat = os.stat(BUDGETS_FILE)
+    except FileNotFoundError:
+        return []
+
+    cache_key = (stat.st_mtime_ns, stat.st_size)
+    if _budgets_cache["key"] != cache_key:
+        _budgets_cache["budgets"] = _read_budgets_file()
+        _budgets_cache["key"] = cache_key
+    return _budgets_cache["budgets"]
+
+def _read_budgets_file() -> list[Budget]:
+    """Parses every budget in the budgets file."""
     budgets = []
-    if not os.path.exists(BUDGETS_FILE):
-        return budgets
-
+    # One read and a C-level split; the file is tiny, so holding it whole is fine
     with open(BUDGETS_FILE, "r") as f:
-        for line in f:
-            try:
-                category, amount_paisa_str = line.strip().split(",", 1)
-                budgets.append(
-                    Budget(
-                        category=category,
-                        amount=int(amount_paisa_str)
-                    )
+        lines = f.read().splitlines()
+
+    for line in lines:
+        try:
+            category, amount_paisa_str = line.strip().split(",", 1)
+            budgets.append(
+                Budget(
+                    # Interned like transaction categories, so lookups between them compare by identity
+                    category=sys.intern(category),
+                    amount=int(amount_paisa_str)
                 )
-            except ValueError:
-                console.print(f"[red]Skipping malformed budget: {line.strip()}[/red]")
+            )
+        except ValueError:
+            console.print(f"[red]Skipping malformed budget: {line.strip()}[/red]")
     return budgets
 
 def save_budgets(budgets: list[Budget]):
@@ -41,6 +63,8 @@ def save_budgets(budgets: list[Budget]):
     with open(BUDGETS_FILE, "w") as f:
         for budget in budgets:
             f.write(f"{budget.category},{budget.amount}\n")
+    # A same-size rewrite can keep the old mtime on coarse-grained filesystems
+    _budgets_cache["key"] = None
 
 import questionary
 from rich.console import Console
@@ -60,7 +84,8 @@ def set_budget():
 
     amount = get_valid_amount(f"Enter monthly budget amount for {category} (e.g., 500.00):")
 
-    current_budgets = load_budgets()
+    # Copy, the loaded list is shared
+    current_budgets = list(load_budgets())
     
     # Check if budget for this category already exists
     updated = False
@@ -68,17 +93,16 @@ def set_budget():
         if budget.category == category:
             current_budgets[i] = Budget(category=category, amount=amount)
             updated = True
-            console.print(f"[green]Budget for {category} updated to {from_paisa(amount):.2f}.[/green]")
+            console.print(f"[green]Budget for {category} updated to {format_paisa(amount)}.[/green]")
             break
     
     if not updated:
         current_budgets.append(Budget(category=category, amount=amount))
-        console.print(f"[green]Budget for {category} set to {from_paisa(amount):.2f}.[/green]")
+        console.print(f"[green]Budget for {category} set to {format_paisa(amount)}.[/green]")
     
     save_budgets(current_budgets)
 
 from rich.table import Table
-from rich.progress import Progress, BarColumn, TextColumn, MofNCompleteColumn
 from datetime import datetime
 
 # Import load_transactions from transactions module
@@ -86,6 +110,9 @@ from features.transactions.transactions import load_transactions
 
 def view_budgets():
     """Displays current month's budget vs actual spending for each category."""
+    # Imported here, analytics imports this module at load time
+    from features.analytics.analytics import current_month_category_spending
+
     console.print("\n[bold green]Monthly Budget Overview[/bold green]")
 
     budgets = load_budgets()
@@ -93,15 +120,11 @@ def view_budgets():
         console.print("[yellow]No budgets set yet. Use 'Set Budget' to add one.[/yellow]")
         return
 
-    transactions = load_transactions()
-    current_month_str = datetime.now().strftime("%Y-%m")
+    now = datetime.now()
+    current_month_str = now.strftime("%Y-%m")
 
     # Calculate spending for the current month per category
-    category_spending = {budget.category: 0 for budget in budgets}
-    for t in transactions:
-        if t.date.startswith(current_month_str) and t.type == "expense":
-            if t.category in category_spending:
-                category_spending[t.category] += t.amount
+    category_spending = current_month_category_spending(budgets, load_transactions(), now)
     
     table = Table(
         title=f"[bold]Budget for {current_month_str}[/bold]",
@@ -119,54 +142,36 @@ def view_budgets():
     total_spent_amount = 0
     over_budget_categories = []
 
-    with Progress(
-        TextColumn("[progress.description]{task.description}"),
-        BarColumn(),
-        MofNCompleteColumn(),
-        console=console,
-        transient=True
-    ) as progress:
-        for budget in budgets:
-            task = progress.add_task(f"Processing [blue]{budget.category}[/blue]...", total=budget.amount)
-
-            spent = category_spending.get(budget.category, 0)
-            remaining = budget.amount - spent
-            utilization_percent = (spent / budget.amount * 100) if budget.amount > 0 else 0
-
-            status_text = ""
-            status_style = ""
-
-            if utilization_percent >= 100:
-                status_text = "OVER"
-                status_style = "bold red"
-                over_budget_categories.append(budget.category)
-            elif utilization_percent >= 70:
-                status_text = "WARNING"
-                status_style = "bold yellow"
-            else:
-                status_text = "OK"
-                status_style = "bold green"
-            
-            # Progress bar color based on utilization
-            bar_color = "green"
-            if utilization_percent >= 70 and utilization_percent < 100:
-                bar_color = "yellow"
-            elif utilization_percent >= 100:
-                bar_color = "red"
-
-            progress.update(task, completed=min(spent, budget.amount)) # Cap completed at budget for bar
-            
-            table.add_row(
-                budget.category,
-                f"{from_paisa(budget.amount):.2f}",
-                f"{from_paisa(spent):.2f}",
-                f"[{'green' if remaining >= 0 else 'red'}]{from_paisa(remaining):.2f}[/]",
-                f"[{bar_color}]{utilization_percent:.0f}%[/]",
-                f"[{status_style}]{status_text}[/{status_style}]"
-            )
-
-            total_budget_amount += budget.amount
-            total_spent_amount += spent
+    # Compute every cell first, then hand the rows to the table in one pass
+    rows = []
+    for budget in budgets:
+        spent = category_spending.get(budget.category, 0)
+        remaining = budget.amount - spent
+        utilization_percent = (spent / budget.amount * 100) if budget.amount > 0 else 0
+
+        # Status and utilization cell color share the same thresholds
+        if utilization_percent >= 100:
+            status_text, status_style, bar_color = "OVER", "bold red", "red"
+            over_budget_categories.append(budget.category)
+        elif utilization_percent >= 70:
+            status_text, status_style, bar_color = "WARNING", "bold yellow", "yellow"
+        else:
+            status_text, status_style, bar_color = "OK", "bold green", "green"
+
+        rows.append((
+            budget.category,
+            format_paisa(budget.amount),
+            format_paisa(spent),
+            f"[{'green' if remaining >= 0 else 'red'}]{format_paisa(remaining)}[/]",
+            f"[{bar_color}]{utilization_percent:.0f}%[/]",
+            f"[{status_style}]{status_text}[/{status_style}]"
+        ))
+
+        total_budget_amount += budget.amount
+        total_spent_amount += spent
+
+    for row in rows:
+        table.add_row(*row)
     
     total_remaining_amount = total_budget_amount - total_spent_amount
     overall_utilization_percent = (total_spent_amount / total_budget_amount * 100) if total_budget_amount > 0 else 0
@@ -175,9 +180,9 @@ def view_budgets():
     table.add_section()
     table.add_row(
         "[bold]TOTAL[/bold]",
-        f"[bold]{from_paisa(total_budget_amount):.2f}[/bold]",
-        f"[bold]{from_paisa(total_spent_amount):.2f}[/bold]",
-        f"[bold {overall_balance_style}]{from_paisa(total_remaining_amount):.2f}[/bold {overall_balance_style}]",
+        f"[bold]{format_paisa(total_budget_amount)}[/bold]",
+        f"[bold]{format_paisa(total_spent_amount)}[/bold]",
+        f"[bold {overall_balance_style}]{format_paisa(total_remaining_amount)}[/bold {overall_balance_style}]",
         f"[bold]{overall_utilization_percent:.0f}%[/bold]",
         ""
     )
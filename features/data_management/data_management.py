@@ -4,32 +4,101 @@ import json
 import os
 import shutil
 import time
-from datetime import datetime
+import zipfile
+from datetime import date, datetime
 
 from rich.console import Console
 import questionary
 from rich.prompt import Prompt
 
+# orjson parses JSON lines several times faster; it is optional
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
 # Define project structure paths
 DATABASE_DIR = "database"
 TRANSACTIONS_FILE = os.path.join(DATABASE_DIR, "transactions.txt")
 BUDGETS_FILE = os.path.join(DATABASE_DIR, "budgets.txt")
+SIGNATURES_FILE = os.path.join(DATABASE_DIR, "signatures.idx")
+# Version of the transactions file the signature index matches
+SIGNATURES_VERSION_FILE = os.path.join(DATABASE_DIR, "signatures.ver")
 EXPORT_DIR = "exports"
 BACKUP_DIR = "backups"
 
+# Column order of exported transaction CSV files
+FIELDNAMES = ["date", "description", "amount", "category", "type"]
+
 console = Console()
 
 
 
+def _iter_transactions():
+    """Yields transactions from the file one at a time."""
+    if not os.path.exists(TRANSACTIONS_FILE):
+        return
+    # Binary mode skips the text decoder; both JSON parsers accept bytes
+    with open(TRANSACTIONS_FILE, "rb") as f:
+        for line in f:
+            # Skip empty lines before trying to parse JSON
+            if line.strip():
+                yield _json_loads(line)
+
+
 def _get_transactions():
     """Reads and returns all transactions from the file."""
+    return list(_iter_transactions())
+
+
+def _signature(transaction) -> str:
+    """Returns the duplicate-check signature of a transaction as one index line."""
+    # JSON keeps descriptions containing separators unambiguous
+    return json.dumps([transaction['date'], transaction['description'], transaction['amount']])
+
+
+def _transactions_version() -> str:
+    """Returns the modification time and size of the transactions file as one line."""
+    stat = os.stat(TRANSACTIONS_FILE)
+    return f"{stat.st_mtime_ns} {stat.st_size}"
+
+
+def _write_file_atomic(path: str, text: str):
+    """Writes text to path through a temporary file, so path is never left half-written."""
+    tmp_file = path + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_file, path)
+
+
+def _rebuild_signatures() -> set[str]:
+    """Rebuilds the signature index from the transactions file."""
+    # Taken before reading, so a write during the rebuild leaves the index out of date
+    version = _transactions_version()
+    signatures = {_signature(t) for t in _iter_transactions()}
+    _write_file_atomic(SIGNATURES_FILE, "".join([f"{signature}\n" for signature in signatures]))
+    # The version goes last: until it is written, the index counts as out of date
+    _write_file_atomic(SIGNATURES_VERSION_FILE, version)
+    return signatures
+
+
+def _load_signatures() -> set[str]:
+    """
+    Returns the signatures of all stored transactions.
+    They are read from the index file, which is rebuilt whenever it is
+    missing or its version file doesn't match the transactions file.
+    """
     if not os.path.exists(TRANSACTIONS_FILE):
-        return []
-    with open(TRANSACTIONS_FILE, "r") as f:
-        # Filter out empty lines before trying to parse JSON
-        lines = [line for line in f if line.strip()]
-        transactions = [json.loads(line) for line in lines]
-    return transactions
+        return set()
+    try:
+        with open(SIGNATURES_VERSION_FILE, "r", encoding="utf-8") as f:
+            version = f.read()
+        if version != _transactions_version():
+            return _rebuild_signatures()
+        with open(SIGNATURES_FILE, "r", encoding="utf-8") as f:
+            return set(f.read().splitlines())
+    except FileNotFoundError:
+        return _rebuild_signatures()
 
 
 def export_transactions_csv():
@@ -43,13 +112,9 @@ def export_transactions_csv():
     file_path = os.path.join(EXPORT_DIR, f"transactions_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
 
     try:
-        # Ensure all fieldnames are captured from all transactions
-        fieldnames = set()
-        for t in transactions:
-            fieldnames.update(t.keys())
-
         with open(file_path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=sorted(list(fieldnames)))
+            # Fixed schema; keys outside it are left out of the export
+            writer = csv.DictWriter(f, fieldnames=FIELDNAMES, extrasaction="ignore")
             writer.writeheader()
             writer.writerows(transactions)
         console.print(
@@ -94,7 +159,7 @@ def import_transactions_csv():
     try:
         with open(file_path, "r", newline="", encoding="utf-8") as f:
             reader = csv.DictReader(f)
-            new_transactions = [row for row in reader]
+            new_transactions = list(reader)
     except Exception as e:
         console.print(f"[red]An error occurred while reading the CSV file: {e}[/red]")
         return
@@ -105,6 +170,7 @@ def import_transactions_csv():
 
     # --- Validation ---
     validated_transactions = []
+    today_str = datetime.now().strftime('%Y-%m-%d')
     for i, t in enumerate(new_transactions, 1):
         if "amount" not in t or "description" not in t or "category" not in t or "type" not in t:
             console.print(
@@ -119,25 +185,21 @@ def import_transactions_csv():
             return
         # Add a default date if not present
         if 'date' not in t or not t['date']:
-            t['date'] = datetime.now().strftime('%Y-%m-%d')
+            t['date'] = today_str
         validated_transactions.append(t)
 
     # --- Duplicate Check ---
     try:
-        existing_transactions = _get_transactions()
-        # Create a set of tuples for efficient duplicate checking
-        existing_signatures = {
-            (trans['date'], trans['description'], trans['amount'])
-            for trans in existing_transactions
-        }
+        # Signatures come from the persisted index, so repeat imports
+        # don't re-parse the whole transactions file
+        existing_signatures = _load_signatures()
     except Exception as e:
         console.print(f"[red]Could not read existing transactions for duplicate check: {e}[/red]")
         return
         
     unique_new_transactions = []
     for t in validated_transactions:
-        signature = (t['date'], t['description'], t['amount'])
-        if signature not in existing_signatures:
+        if _signature(t) not in existing_signatures:
             unique_new_transactions.append(t)
 
     if not unique_new_transactions:
@@ -150,9 +212,14 @@ def import_transactions_csv():
     
     if confirmed.lower() == 'y':
         try:
+            # Each file gets the whole batch in a single write
             with open(TRANSACTIONS_FILE, "a", encoding="utf-8") as f:
-                for t in unique_new_transactions:
-                    f.write(json.dumps(t) + "\n")
+                f.write("".join([json.dumps(t) + "\n" for t in unique_new_transactions]))
+            # Only the new signatures are appended. The version is updated last,
+            # so an interrupted write leaves the index out of date and it is rebuilt
+            with open(SIGNATURES_FILE, "a", encoding="utf-8") as f:
+                f.write("".join([_signature(t) + "\n" for t in unique_new_transactions]))
+            _write_file_atomic(SIGNATURES_VERSION_FILE, _transactions_version())
             console.print(
                 f"[green]Successfully imported [bold]{len(unique_new_transactions)}[/bold] transactions.[/green]"
             )
@@ -161,6 +228,15 @@ def import_transactions_csv():
 
 
 
+def _list_backups() -> list[str]:
+    """Returns backup archive names in the backup directory, newest first."""
+    # scandir entries cache their stat result, so each file is stat'ed once
+    with os.scandir(BACKUP_DIR) as it:
+        entries = [(e.name, e.stat().st_mtime) for e in it if e.name.endswith(".zip")]
+    entries.sort(key=lambda entry: entry[1], reverse=True)
+    return [name for name, _ in entries]
+
+
 def backup_data():
     """Creates a timestamped backup of the data files."""
     if not os.path.exists(DATABASE_DIR):
@@ -173,7 +249,17 @@ def backup_data():
     backup_filename_base = os.path.join(BACKUP_DIR, f"backup_{timestamp}")
 
     try:
-        shutil.make_archive(backup_filename_base, 'zip', DATABASE_DIR)
+        # The data files are small text files; the fastest deflate level
+        # keeps most of the size saving at a fraction of the default's cost
+        with zipfile.ZipFile(
+            backup_filename_base + ".zip", "w", zipfile.ZIP_DEFLATED, compresslevel=1
+        ) as zf:
+            for root, _, files in os.walk(DATABASE_DIR):
+                for name in files:
+                    path = os.path.join(root, name)
+                    # The signature index is derived data, rebuilt on demand
+                    if path not in (SIGNATURES_FILE, SIGNATURES_VERSION_FILE):
+                        zf.write(path, arcname=os.path.relpath(path, DATABASE_DIR))
         console.print(f"[green]Successfully created backup at [bold]{backup_filename_base}.zip[/bold][/green]")
     except Exception as e:
         console.print(f"[red]Error creating backup: {e}[/red]")
@@ -181,11 +267,7 @@ def backup_data():
 
     # --- Auto-cleanup old backups (keep last 10) ---
     try:
-        backups = sorted(
-            [f for f in os.listdir(BACKUP_DIR) if f.endswith(".zip")],
-            key=lambda f: os.path.getmtime(os.path.join(BACKUP_DIR, f)),
-            reverse=True,
-        )
+        backups = _list_backups()
         if len(backups) > 10:
             num_to_delete = len(backups) - 10
             for old_backup in backups[10:]:
@@ -200,11 +282,7 @@ def restore_data():
         console.print("[yellow]No backup directory found. Nothing to restore.[/yellow]")
         return
 
-    backups = sorted(
-        [f for f in os.listdir(BACKUP_DIR) if f.endswith(".zip")],
-        key=lambda f: os.path.getmtime(os.path.join(BACKUP_DIR, f)),
-        reverse=True,
-    )
+    backups = _list_backups()
 
     if not backups:
         console.print("[yellow]No backup files (.zip) found in the backup directory.[/yellow]")
@@ -234,6 +312,9 @@ def restore_data():
 
             # Extract the backup
             shutil.unpack_archive(backup_path, DATABASE_DIR, 'zip')
+            # Older backups may include an index; rebuilding is cheaper than trusting it
+            if os.path.exists(SIGNATURES_FILE):
+                os.remove(SIGNATURES_FILE)
             console.print(f"[green]Successfully restored data from [bold]{selected_backup}[/bold][/green]")
         except Exception as e:
             console.print(f"[red]An error occurred during restore: {e}[/red]")
@@ -255,79 +336,95 @@ def validate_data():
     if not os.path.exists(TRANSACTIONS_FILE) or os.path.getsize(TRANSACTIONS_FILE) == 0:
         console.print("[yellow]Transaction file is missing or empty. Skipping.[/yellow]")
     else:
-        valid_lines = []
+        # Valid lines are streamed to a temporary file that replaces the
+        # original only if corrupt entries are removed
+        tmp_file = TRANSACTIONS_FILE + ".tmp"
         errors_in_file = 0
-        with open(TRANSACTIONS_FILE, "r", encoding="utf-8") as f:
-            for i, line in enumerate(f, 1):
-                is_valid = True
-                try:
-                    data = json.loads(line)
-                    required = ["date", "description", "amount", "category", "type"]
-                    if not all(field in data for field in required):
-                        errors_in_file += 1
-                        console.print(f"  [red]Error L{i}:[/red] Missing required fields. Found: {list(data.keys())}")
-                        is_valid = False
-                    if not isinstance(data.get("amount"), int):
-                        errors_in_file += 1
-                        console.print(f"  [red]Error L{i}:[/red] 'amount' must be an integer. Found: {type(data.get('amount'))}")
-                        is_valid = False
+        try:
+            # Lines are parsed and copied as raw bytes, skipping the text codec
+            with open(TRANSACTIONS_FILE, "rb") as f, open(tmp_file, "wb") as tmp:
+                for i, line in enumerate(f, 1):
+                    is_valid = True
                     try:
-                        if data.get("date"):
-                            datetime.strptime(data["date"], "%Y-%m-%d")
-                    except (ValueError, TypeError):
+                        data = _json_loads(line)
+                        required = ["date", "description", "amount", "category", "type"]
+                        if not all(field in data for field in required):
+                            errors_in_file += 1
+                            console.print(f"  [red]Error L{i}:[/red] Missing required fields. Found: {list(data.keys())}")
+                            is_valid = False
+                        if not isinstance(data.get("amount"), int):
+                            errors_in_file += 1
+                            console.print(f"  [red]Error L{i}:[/red] 'amount' must be an integer. Found: {type(data.get('amount'))}")
+                            is_valid = False
+                        try:
+                            # fromisoformat is C-implemented but also accepts forms like
+                            # '20250101', so require the round trip to match exactly
+                            if data.get("date") and date.fromisoformat(data["date"]).isoformat() != data["date"]:
+                                raise ValueError
+                        except (ValueError, TypeError):
+                            errors_in_file += 1
+                            console.print(f"  [red]Error L{i}:[/red] 'date' is not a valid YYYY-MM-DD string. Found: {data.get('date')}")
+                            is_valid = False
+                    except json.JSONDecodeError:
                         errors_in_file += 1
-                        console.print(f"  [red]Error L{i}:[/red] 'date' is not a valid YYYY-MM-DD string. Found: {data.get('date')}")
+                        console.print(f"  [red]Error L{i}:[/red] Line is not valid JSON.")
                         is_valid = False
-                except json.JSONDecodeError:
-                    errors_in_file += 1
-                    console.print(f"  [red]Error L{i}:[/red] Line is not valid JSON.")
-                    is_valid = False
                 
-                if is_valid:
-                    valid_lines.append(line)
+                    if is_valid:
+                        tmp.write(line)
         
-        if errors_in_file > 0:
-            total_errors += errors_in_file
-            if questionary.confirm(f"Found {errors_in_file} errors in transactions. Remove corrupt entries?").ask():
-                with open(TRANSACTIONS_FILE, "w", encoding="utf-8") as f:
-                    f.writelines(valid_lines)
-                console.print(f"[green]Removed {errors_in_file} corrupt entries from transactions.[/green]")
+            if errors_in_file > 0:
+                total_errors += errors_in_file
+                if questionary.confirm(f"Found {errors_in_file} errors in transactions. Remove corrupt entries?").ask():
+                    os.replace(tmp_file, TRANSACTIONS_FILE)
+                    _rebuild_signatures()
+                    console.print(f"[green]Removed {errors_in_file} corrupt entries from transactions.[/green]")
+        finally:
+            # Also cleaned up when a line fails in a way the checks above don't catch
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
 
     # --- Validate Budgets File ---
     console.print(f"\n[bold]Checking [green]{BUDGETS_FILE}[/green]...[/bold]")
     if not os.path.exists(BUDGETS_FILE) or os.path.getsize(BUDGETS_FILE) == 0:
         console.print("[yellow]Budgets file is missing or empty. Skipping.[/yellow]")
     else:
-        valid_lines = []
+        # Valid lines are streamed to a temporary file that replaces the
+        # original only if corrupt entries are removed
+        tmp_file = BUDGETS_FILE + ".tmp"
         errors_in_file = 0
-        with open(BUDGETS_FILE, "r", encoding="utf-8") as f:
-            for i, line in enumerate(f, 1):
-                is_valid = True
-                try:
-                    data = json.loads(line)
-                    required = ["category", "amount"]
-                    if not all(field in data for field in required):
-                        errors_in_file += 1
-                        console.print(f"  [red]Error L{i}:[/red] Missing required fields. Found: {list(data.keys())}")
-                        is_valid = False
-                    if not isinstance(data.get("amount"), int):
+        try:
+            with open(BUDGETS_FILE, "rb") as f, open(tmp_file, "wb") as tmp:
+                for i, line in enumerate(f, 1):
+                    is_valid = True
+                    try:
+                        data = _json_loads(line)
+                        required = ["category", "amount"]
+                        if not all(field in data for field in required):
+                            errors_in_file += 1
+                            console.print(f"  [red]Error L{i}:[/red] Missing required fields. Found: {list(data.keys())}")
+                            is_valid = False
+                        if not isinstance(data.get("amount"), int):
+                            errors_in_file += 1
+                            console.print(f"  [red]Error L{i}:[/red] 'amount' must be an integer. Found: {type(data.get('amount'))}")
+                            is_valid = False
+                    except json.JSONDecodeError:
                         errors_in_file += 1
-                        console.print(f"  [red]Error L{i}:[/red] 'amount' must be an integer. Found: {type(data.get('amount'))}")
+                        console.print(f"  [red]Error L{i}:[/red] Line is not valid JSON.")
                         is_valid = False
-                except json.JSONDecodeError:
-                    errors_in_file += 1
-                    console.print(f"  [red]Error L{i}:[/red] Line is not valid JSON.")
-                    is_valid = False
                 
-                if is_valid:
-                    valid_lines.append(line)
-
-        if errors_in_file > 0:
-            total_errors += errors_in_file
-            if questionary.confirm(f"Found {errors_in_file} errors in budgets. Remove corrupt entries?").ask():
-                with open(BUDGETS_FILE, "w", encoding="utf-8") as f:
-                    f.writelines(valid_lines)
-                console.print(f"[green]Removed {errors_in_file} corrupt entries from budgets.[/green]")
+                    if is_valid:
+                        tmp.write(line)
+
+            if errors_in_file > 0:
+                total_errors += errors_in_file
+                if questionary.confirm(f"Found {errors_in_file} errors in budgets. Remove corrupt entries?").ask():
+                    os.replace(tmp_file, BUDGETS_FILE)
+                    console.print(f"[green]Removed {errors_in_file} corrupt entries from budgets.[/green]")
+        finally:
+            # Also cleaned up when a line fails in a way the checks above don't catch
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
     
     # --- Summary ---
     console.print("\n[bold cyan]Validation Complete.[/bold cyan]")
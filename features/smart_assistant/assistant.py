@@ -1,42 +1,54 @@
-from datetime import datetime, timedelta
+from calendar import monthrange
+from datetime import datetime
+from heapq import nlargest
+from operator import attrgetter
 from rich.console import Console
 from rich.panel import Panel
-from features.transactions.transactions import load_transactions, from_paisa
-from features.budgets.budgets import load_budgets
+from features.transactions.transactions import (
+    load_transactions, sort_transactions_by_date, filter_transactions_by_day,
+    Transaction, from_paisa, format_paisa
+)
+from features.budgets.budgets import load_budgets, Budget
 from features.analytics.analytics import (
     get_total_income,
-    get_total_spending,
+    get_income_and_spending,
     filter_transactions_by_month,
+    current_month_category_spending,
 )
 
 console = Console()
 
+# Only the biggest large transactions are reported, to keep the alert list readable
+MAX_LARGE_TRANSACTION_ALERTS = 5
+
 
 def daily_financial_check():
     """
     Provides a daily financial check with spending, budget alerts, and tips.
     """
+    now = datetime.now()
     console.print(Panel(
-        f"[bold cyan]📊 Daily Financial Check ({datetime.now().strftime('%b %d, %Y')})[/bold cyan]",
+        f"[bold cyan]📊 Daily Financial Check ({now.strftime('%b %d, %Y')})[/bold cyan]",
         expand=False
     ))
 
-    today_str = datetime.now().strftime("%Y-%m-%d")
+    today_str = now.strftime("%Y-%m-%d")
     all_transactions = load_transactions()
     all_budgets = load_budgets()
 
     # --- Today's Spending ---
+    # Only today's slice of the date-sorted list is visited
     todays_spending = sum(
-        t.amount for t in all_transactions
-        if t.date == today_str and t.type == "expense"
+        t.amount for t in filter_transactions_by_day(all_transactions, today_str)
+        if t.type == "expense"
     )
-    console.print(f"Today's Spending: [bold red]Rs {from_paisa(todays_spending):.2f}[/bold red]")
+    console.print(f"Today's Spending: [bold red]Rs {format_paisa(todays_spending)}[/bold red]")
 
     # --- Daily Budget ---
     if all_budgets:
         monthly_budget = sum(b.amount for b in all_budgets)
-        days_in_month = (datetime.now().replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-        daily_budget = monthly_budget / days_in_month.day
+        days_in_month = monthrange(now.year, now.month)[1]
+        daily_budget = monthly_budget / days_in_month
         remaining_daily_budget = daily_budget - todays_spending
 
         status_icon = "✅" if remaining_daily_budget >= 0 else "❌"
@@ -52,7 +64,7 @@ def daily_financial_check():
         console.print("Daily Budget: [yellow]Not set. Consider setting monthly budgets.[/yellow]")
 
     # --- Alerts ---
-    alerts = get_spending_alerts()
+    alerts = get_spending_alerts(all_transactions, all_budgets)
     if alerts:
         console.print("\n[bold yellow]⚠️ Alerts:[/bold yellow]")
         for alert in alerts:
@@ -65,23 +77,25 @@ def daily_financial_check():
     console.print(f"{get_quick_tip()}")
 
 
-def get_spending_alerts() -> list[str]:
+def get_spending_alerts(
+    transactions: list[Transaction] | None = None,
+    budgets: list[Budget] | None = None
+) -> list[str]:
     """
     Generates a list of spending alerts based on current financial data.
+    Already loaded transactions and budgets can be passed in to avoid reloading them;
+    transactions are sorted by date first if they aren't already.
     """
     alerts = []
-    all_transactions = load_transactions()
-    all_budgets = load_budgets()
+    all_transactions = (
+        sort_transactions_by_date(transactions) if transactions is not None else load_transactions()
+    )
+    all_budgets = budgets if budgets is not None else load_budgets()
     today = datetime.now()
-    current_month_str = today.strftime("%Y-%m")
 
     # --- Budget Alerts (>80% used) ---
     if all_budgets:
-        category_spending = {b.category: 0 for b in all_budgets}
-        for t in all_transactions:
-            if t.date.startswith(current_month_str) and t.type == "expense":
-                if t.category in category_spending:
-                    category_spending[t.category] += t.amount
+        category_spending = current_month_category_spending(all_budgets, all_transactions, today)
 
         for budget in all_budgets:
             utilization = (category_spending[budget.category] / budget.amount * 100) if budget.amount > 0 else 0
@@ -104,12 +118,19 @@ def get_spending_alerts() -> list[str]:
 
     if monthly_income > 0:
         large_transaction_threshold = monthly_income * 0.20
-        for t in current_month_transactions:
-            if t.type == "expense" and t.amount > large_transaction_threshold:
-                alerts.append(
-                    f"[yellow]Large transaction detected: Rs {from_paisa(t.amount):.2f} "
-                    f"for '{t.description}' ({t.category}).[/yellow]"
-                )
+        large_expenses = nlargest(
+            MAX_LARGE_TRANSACTION_ALERTS,
+            (
+                t for t in current_month_transactions
+                if t.type == "expense" and t.amount > large_transaction_threshold
+            ),
+            key=attrgetter("amount")
+        )
+        for t in large_expenses:
+            alerts.append(
+                f"[yellow]Large transaction detected: Rs {format_paisa(t.amount)} "
+                f"for '{t.description}' ({t.category}).[/yellow]"
+            )
 
     return alerts
 
@@ -139,15 +160,11 @@ def smart_recommendations():
     all_transactions = load_transactions()
     all_budgets = load_budgets()
     recommendations = []
+    today = datetime.now()
 
     # --- Recommendation 1: Overspending Categories ---
     if all_budgets:
-        current_month_str = datetime.now().strftime("%Y-%m")
-        category_spending = {b.category: 0 for b in all_budgets}
-        for t in all_transactions:
-            if t.date.startswith(current_month_str) and t.type == "expense":
-                if t.category in category_spending:
-                    category_spending[t.category] += t.amount
+        category_spending = current_month_category_spending(all_budgets, all_transactions, today)
 
         over_budget_categories = [
             b.category for b in all_budgets
@@ -160,12 +177,10 @@ def smart_recommendations():
             )
 
     # --- Recommendation 2: Low Savings Rate ---
-    today = datetime.now()
     current_month_transactions = filter_transactions_by_month(
         all_transactions, today.year, today.month
     )
-    total_income = get_total_income(current_month_transactions)
-    total_spending = get_total_spending(current_month_transactions)
+    total_income, total_spending = get_income_and_spending(current_month_transactions)
 
     if total_income > 0:
         savings_rate = ((total_income - total_spending) / total_income) * 100
@@ -1,7 +1,11 @@
+import sys
+from bisect import bisect_left, bisect_right
+from itertools import pairwise
+from operator import attrgetter
 import questionary
 from rich.console import Console
 from rich.table import Table
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import NamedTuple
 
 # --- Transaction Data Structure ---
@@ -32,6 +36,15 @@ def from_paisa(paisa_amount: int) -> float:
     """Converts integer paisa (e.g., 1250) back to float amount (e.g., 12.50)."""
     return paisa_amount / 100.0
 
+def format_paisa(paisa_amount: int) -> str:
+    """
+    Formats integer paisa (e.g., -1250) as a two-decimal string (e.g., '-12.50').
+    Same output as f"{from_paisa(x):.2f}" but uses integer arithmetic only.
+    """
+    sign = "-" if paisa_amount < 0 else ""
+    rupees, paisa = divmod(abs(paisa_amount), 100)
+    return f"{sign}{rupees}.{paisa:02d}"
+
 # --- Date Handling ---
 def get_valid_date(prompt: str) -> str:
     """
@@ -52,41 +65,112 @@ def get_valid_date(prompt: str) -> str:
 
 import os
 
+# Plain text, one 'date,type,category,description,amount' row per line. The file
+# is shared with the Streamlit app and data management, so it stays text;
+# load_transactions() caches the parsed rows to avoid re-parsing it.
 TRANSACTIONS_FILE = "database/transactions.txt"
 
+# Parsed transactions are reused until the file changes on disk
+_transactions_cache = {"key": None, "transactions": []}
+
 def load_transactions() -> list[Transaction]:
-    """Loads transactions from the transactions file."""
+    """
+    Loads transactions from the transactions file, sorted by date (oldest first).
+    The parsed list is cached and shared between callers until the file's
+    modification time or size changes, so callers must not mutate it.
+    """
+    try:
+        stat = os.stat(TRANSACTIONS_FILE)
+    except FileNotFoundError:
+        return []
+
+    cache_key = (stat.st_mtime_ns, stat.st_size)
+    if _transactions_cache["key"] != cache_key:
+        transactions = _read_transactions_file()
+        # ISO 'YYYY-MM-DD' strings sort chronologically; the sort is stable
+        transactions.sort(key=lambda t: t.date)
+        _transactions_cache["transactions"] = transactions
+        _transactions_cache["key"] = cache_key
+    return _transactions_cache["transactions"]
+
+def _read_transactions_file() -> list[Transaction]:
+    """
+    Parses every transaction in the transactions file.
+    Type and category strings are interned so the many rows sharing a value
+    share one string object and equality checks against them hit the identity fast path.
+    """
     transactions = []
-    if not os.path.exists(TRANSACTIONS_FILE):
-        return transactions
-
+    # One bulk read and a C-level split instead of per-line file iteration
     with open(TRANSACTIONS_FILE, "r") as f:
-        for line in f:
-            try:
-                date_str, type_str, category, description, amount_paisa_str = line.strip().split(",", 4)
-                transactions.append(
-                    Transaction(
-                        date=date_str,
-                        type=type_str,
-                        category=category,
-                        description=description,
-                        amount=int(amount_paisa_str)
-                    )
+        lines = f.read().splitlines()
+
+    for line in lines:
+        try:
+            # The amount is split off the right so descriptions containing commas
+            # (written unquoted by save_transactions) stay intact
+            fields_str, amount_paisa_str = line.strip().rsplit(",", 1)
+            date_str, type_str, category, description = fields_str.split(",", 3)
+            transactions.append(
+                Transaction(
+                    date=date_str,
+                    type=sys.intern(type_str),
+                    category=sys.intern(category),
+                    description=description,
+                    amount=int(amount_paisa_str)
                 )
-            except ValueError:
-                console.print(f"[red]Skipping malformed transaction: {line.strip()}[/red]")
+            )
+        except ValueError:
+            console.print(f"[red]Skipping malformed transaction: {line.strip()}[/red]")
     return transactions
 
+def sort_transactions_by_date(transactions: list[Transaction]) -> list[Transaction]:
+    """
+    Returns transactions sorted by date (oldest first), as filter_transactions_by_month
+    and filter_transactions_by_day expect. An already sorted list is returned as is,
+    so results cached against that list object still apply.
+    """
+    if all(a.date <= b.date for a, b in pairwise(transactions)):
+        return transactions
+    return sorted(transactions, key=attrgetter("date"))
+
+def filter_transactions_by_month(
+    transactions: list[Transaction], 
+    year: int, 
+    month: int
+) -> list[Transaction]:
+    """
+    Filters transactions for a specific year and month.
+    Expects transactions sorted by date, as returned by load_transactions,
+    so the month can be located with a binary search instead of a full scan.
+    """
+    next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    by_date = attrgetter("date")
+    start = bisect_left(transactions, f"{year:04d}-{month:02d}", key=by_date)
+    end = bisect_left(transactions, f"{next_year:04d}-{next_month:02d}", key=by_date)
+    return transactions[start:end]
+
+def filter_transactions_by_day(transactions: list[Transaction], date_str: str) -> list[Transaction]:
+    """
+    Returns the transactions dated 'YYYY-MM-DD' date_str.
+    Expects transactions sorted by date, like filter_transactions_by_month.
+    """
+    by_date = attrgetter("date")
+    start = bisect_left(transactions, date_str, key=by_date)
+    end = bisect_right(transactions, date_str, key=by_date)
+    return transactions[start:end]
+
 def save_transaction(transaction: Transaction):
     """Appends a single transaction to the transactions file."""
+    save_transactions([transaction])
+
+def save_transactions(transactions: list[Transaction]):
+    """Appends a batch of transactions to the transactions file with a single write."""
     with open(TRANSACTIONS_FILE, "a") as f:
-        f.write(
-            f"{transaction.date},"
-            f"{transaction.type},"
-            f"{transaction.category},"
-            f"{transaction.description},"
-            f"{transaction.amount}\n"
-        )
+        f.write("".join(
+            f"{t.date},{t.type},{t.category},{t.description},{t.amount}\n"
+            for t in transactions
+        ))
+    _transactions_cache["key"] = None
 
 def get_valid_amount(prompt: str) -> int:
     """
@@ -129,7 +213,7 @@ def add_expense():
         amount=amount
     )
     save_transaction(transaction)
-    console.print(f"[green]Expense of {from_paisa(amount):.2f} added successfully![/green]")
+    console.print(f"[green]Expense of {format_paisa(amount)} added successfully![/green]")
 
 def add_income():
     """Adds a new income transaction."""
@@ -147,7 +231,7 @@ def add_income():
         amount=amount
     )
     save_transaction(transaction)
-    console.print(f"[green]Income of {from_paisa(amount):.2f} added successfully![/green]")
+    console.print(f"[green]Income of {format_paisa(amount)} added successfully![/green]")
 
 def list_transactions():
     """Displays a list of transactions with optional filters."""
@@ -157,8 +241,9 @@ def list_transactions():
         console.print("[yellow]No transactions recorded yet.[/yellow]")
         return
 
-    # Sort transactions by date, newest first
-    transactions.sort(key=lambda t: datetime.strptime(t.date, "%Y-%m-%d"), reverse=True)
+    # Sort transactions by date, newest first (a copy, the loaded list is shared).
+    # 'YYYY-MM-DD' strings sort chronologically, so no parsing is needed.
+    transactions = sorted(transactions, key=lambda t: t.date, reverse=True)
 
     # Filtering options
     filter_choice = questionary.select(
@@ -166,29 +251,9 @@ def list_transactions():
         choices=["All", "Last 7 Days", "Only Expenses", "Only Income"]
     ).ask()
 
-    filtered_transactions = []
-    today = datetime.now()
-
-    for t in transactions:
-        include = True
-        transaction_date = datetime.strptime(t.date, "%Y-%m-%d")
-
-        if filter_choice == "Last 7 Days":
-            if (today - transaction_date).days > 7:
-                include = False
-        elif filter_choice == "Only Expenses":
-            if t.type != "expense":
-                include = False
-        elif filter_choice == "Only Income":
-            if t.type != "income":
-                include = False
-        
-        if include:
-            filtered_transactions.append(t)
-
-    if not filtered_transactions:
-        console.print("[yellow]No transactions found matching the filter criteria.[/yellow]")
-        return
+    # 'YYYY-MM-DD' strings compare chronologically, so the 7-day window is a
+    # plain string comparison against a cutoff computed once
+    cutoff_str = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
 
     table = Table(
         title="[bold]Transactions[/bold]",
@@ -204,8 +269,19 @@ def list_transactions():
     total_income = 0
     total_expense = 0
 
-    for t in filtered_transactions:
-        amount_display = f"{from_paisa(t.amount):.2f}"
+    # Filter, total and add rows in a single pass
+    for t in transactions:
+        if filter_choice == "Last 7 Days":
+            if t.date < cutoff_str:
+                continue
+        elif filter_choice == "Only Expenses":
+            if t.type != "expense":
+                continue
+        elif filter_choice == "Only Income":
+            if t.type != "income":
+                continue
+
+        amount_display = format_paisa(t.amount)
         if t.type == "expense":
             amount_style = "red"
             total_expense += t.amount
@@ -220,14 +296,18 @@ def list_transactions():
             t.description,
             f"[{amount_style}]{amount_display}[/{amount_style}]"
         )
+
+    if not table.row_count:
+        console.print("[yellow]No transactions found matching the filter criteria.[/yellow]")
+        return
     
     total_balance = total_income - total_expense
     balance_style = "green" if total_balance >= 0 else "red"
 
     table.columns[4].footer = (
-        f"[green]Income: {from_paisa(total_income):.2f}[/green]\n"
-        f"[red]Expense: {from_paisa(total_expense):.2f}[/red]\n"
-        f"[{balance_style}]Balance: {from_paisa(total_balance):.2f}[/{balance_style}]"
+        f"[green]Income: {format_paisa(total_income)}[/green]\n"
+        f"[red]Expense: {format_paisa(total_expense)}[/red]\n"
+        f"[{balance_style}]Balance: {format_paisa(total_balance)}[/{balance_style}]"
     )
 
     console.print(table)
@@ -240,22 +320,23 @@ def display_balance():
         console.print("[yellow]No transactions recorded yet.[/yellow]")
         return
 
-    current_month = datetime.now().strftime("%Y-%m")
+    now = datetime.now()
+    current_month = now.strftime("%Y-%m")
     monthly_income = 0
     monthly_expense = 0
 
-    for t in transactions:
-        if t.date.startswith(current_month):
-            if t.type == "income":
-                monthly_income += t.amount
-            else: # expense
-                monthly_expense += t.amount
+    # Only the current month's slice of the sorted list is visited
+    for t in filter_transactions_by_month(transactions, now.year, now.month):
+        if t.type == "income":
+            monthly_income += t.amount
+        else: # expense
+            monthly_expense += t.amount
     
     monthly_balance = monthly_income - monthly_expense
     balance_style = "green" if monthly_balance >= 0 else "red"
 
     console.print(f"\n[bold underline]Balance for {current_month}[/bold underline]")
-    console.print(f"[green]Total Income: {from_paisa(monthly_income):.2f}[/green]")
-    console.print(f"[red]Total Expenses: {from_paisa(monthly_expense):.2f}[/red]")
-    console.print(f"[{balance_style}]Current Balance: {from_paisa(monthly_balance):.2f}[/{balance_style}]")
+    console.print(f"[green]Total Income: {format_paisa(monthly_income)}[/green]")
+    console.print(f"[red]Total Expenses: {format_paisa(monthly_expense)}[/red]")
+    console.print(f"[{balance_style}]Current Balance: {format_paisa(monthly_balance)}[/{balance_style}]")
 
@@ -16,58 +16,41 @@ from features.smart_assistant.assistant import (
 
 console = Console()
 
+# Menu entries mapped to their handlers; "Exit" has no handler and ends the loop
+HANDLERS = {
+    "Add Expense": add_expense,
+    "Add Income": add_income,
+    "List Transactions": list_transactions,
+    "View Balance": display_balance,
+    "Set Budget": set_budget,
+    "View Budgets": view_budgets,
+    "Spending Analysis": spending_analysis,
+    "Income Analysis": income_analysis,
+    "Savings Analysis": savings_analysis,
+    "Financial Health Score": financial_health_score,
+    "Generate Monthly Report": generate_monthly_report,
+    "Daily Financial Check": daily_financial_check,
+    "Smart Recommendations": smart_recommendations,
+    "Exit": None,
+}
+CHOICES = list(HANDLERS)
+
 def main():
     while True:
         console.print("\n[bold magenta]Personal Finance Tracker Menu[/bold magenta]")
         choice = questionary.select(
             "What do you want to do?",
-            choices=[
-                "Add Expense",
-                "Add Income",
-                "List Transactions",
-                "View Balance",
-                "Set Budget",
-                "View Budgets",
-                "Spending Analysis",      # New option
-                "Income Analysis",        # New option
-                "Savings Analysis",       # New option
-                "Financial Health Score", # New option
-                "Generate Monthly Report",# New option
-                "Daily Financial Check",
-                "Smart Recommendations",
-                "Exit"
-            ]
+            choices=CHOICES
         ).ask()
 
-        if choice == "Add Expense":
-            add_expense()
-        elif choice == "Add Income":
-            add_income()
-        elif choice == "List Transactions":
-            list_transactions()
-        elif choice == "View Balance":
-            display_balance()
-        elif choice == "Set Budget":
-            set_budget()
-        elif choice == "View Budgets":
-            view_budgets()
-        elif choice == "Spending Analysis":
-            spending_analysis()
-        elif choice == "Income Analysis":
-            income_analysis()
-        elif choice == "Savings Analysis":
-            savings_analysis()
-        elif choice == "Financial Health Score":
-            financial_health_score()
-        elif choice == "Generate Monthly Report":
-            generate_monthly_report()
-        elif choice == "Daily Financial Check":
-            daily_financial_check()
-        elif choice == "Smart Recommendations":
-            smart_recommendations()
-        elif choice == "Exit":
+        if choice == "Exit":
             console.print("[bold green]Exiting Personal Finance Tracker. Goodbye![/bold green]")
             break
 
+        # A cancelled prompt returns None; just show the menu again
+        handler = HANDLERS.get(choice)
+        if handler:
+            handler()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,3 +1,4 @@
+import os
 import streamlit as st
 import pandas as pd
 from datetime import datetime
@@ -5,52 +6,19 @@ import utils
 
 st.set_page_config(layout="wide")
 
-# Custom CSS for a cleaner, card-based UI
-st.markdown("""
-<style>
-    .reportview-container .main .block-container{
-        max-width: 1200px;
-        padding-top: 2rem;
-        padding-right: 2rem;
-        padding-left: 2rem;
-        padding-bottom: 2rem;
-    }
-    .stApp {
-        background-color: #f0f2f6;
-    }
-    .st-emotion-cache-1r6dm7w { /* This targets the card containers */
-        background-color: white;
-        padding: 20px;
-        border-radius: 10px;
-        box-shadow: 0 4px 8px 0 rgba(0, 0, 0, 0.05);
-        margin-bottom: 20px;
-    }
-    .st-emotion-cache-zt5ig8 { /* Targets metric boxes */
-        background-color: white;
-        padding: 10px;
-        border-radius: 10px;
-        box-shadow: 0 2px 4px 0 rgba(0, 0, 0, 0.03);
-        margin-bottom: 10px;
-    }
-    .st-emotion-cache-10wls0b {
-        background-color: #e6f7ff;
-        border-left: 5px solid #1890ff;
-        padding: 10px;
-        border-radius: 5px;
-        margin-bottom: 10px;
-    }
-    h1, h2, h3, h4, h5, h6 {
-        color: #303030;
-    }
-    .css-1lcbmhc, .css-1d391kg { /* Sidebar styling */
-        background-color: white;
-        box-shadow: 0 4px 8px 0 rgba(0,0,0,0.05);
-    }
-</style>
-""", unsafe_allow_html=True)
-
-# Initialize session state data
-utils.init_session_state_data()
+# Custom CSS for a cleaner, card-based UI, kept in static/style.css
+CSS_FILE = os.path.join(os.path.dirname(__file__), "static", "style.css")
+
+@st.cache_resource
+def load_css() -> str:
+    """Reads the stylesheet once per server process instead of on every rerun."""
+    with open(CSS_FILE, "r") as f:
+        return f"<style>\n{f.read()}</style>"
+
+st.markdown(load_css(), unsafe_allow_html=True)
+
+# Rows shown per page in the "All Transactions" table
+TRANSACTIONS_PAGE_SIZE = 100
 
 def home_page():
     st.title("💰 Personal Finance Tracker Dashboard")
@@ -105,14 +73,21 @@ def transactions_page():
     st.header("All Transactions")
     transactions_df = utils.get_transactions_df()
     if not transactions_df.empty:
+        # Only the selected page is copied, converted and styled, not the whole history
+        page_count = (len(transactions_df) - 1) // TRANSACTIONS_PAGE_SIZE + 1
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1)
+        start = (page - 1) * TRANSACTIONS_PAGE_SIZE
+        page_df = transactions_df.iloc[start:start + TRANSACTIONS_PAGE_SIZE]
+        st.caption(f"Page {page} of {page_count} ({len(transactions_df)} transactions)")
+
         # Display amount in Rs. for user
-        if 'Amount' in transactions_df.columns:
+        if 'Amount' in page_df.columns:
             # Create a copy to avoid SettingWithCopyWarning when modifying 'Amount' for display
-            display_df = transactions_df.copy()
+            display_df = page_df.copy()
             display_df["Amount"] = display_df["Amount"] / 100
             st.dataframe(display_df.style.format({"Amount": "Rs {:,.2f}"}), use_container_width=True)
         else:
-            st.dataframe(transactions_df, use_container_width=True)
+            st.dataframe(page_df, use_container_width=True)
     else:
         st.info("No transactions recorded yet.")
 
@@ -138,50 +113,36 @@ def budgets_page():
     spent_by_category = utils.get_spent_by_category(transactions_df)
 
     if not budgets_df.empty:
-        budget_summary = []
-        for index, row in budgets_df.iterrows():
-            category = row["Category"]
-            budget = row["Budget"]
-            spent = spent_by_category.get(category, 0)
-            remaining = budget - spent
-            utilization_percent = (spent / budget * 100) if budget > 0 else 0
-
-            # Determine color for progress bar
-            if utilization_percent < 70:
-                color = "green"
-            elif utilization_percent < 100:
-                color = "orange"
-            else:
-                color = "red"
-            
-            budget_summary.append({
-                "Category": category,
-                "Budget": f"Rs {budget / 100:,.2f}",
-                "Spent": f"Rs {spent / 100:,.2f}",
-                "Remaining": f"Rs {remaining / 100:,.2f}",
-                "Utilization": f"{utilization_percent:.2f}%",
-                "Progress": utilization_percent,
-                "Color": color
-            })
-        
-        summary_df = pd.DataFrame(budget_summary)
-
-        for index, row in summary_df.iterrows():
-            st.markdown(f"#### {row['Category']}")
+        # Compute the whole summary with column operations instead of iterrows()
+        summary_df = budgets_df[["Budget"]].copy()
+        summary_df["Spent"] = summary_df.index.map(spent_by_category).fillna(0)
+        summary_df["Remaining"] = summary_df["Budget"] - summary_df["Spent"]
+        summary_df["Progress"] = (summary_df["Spent"] / summary_df["Budget"] * 100).where(summary_df["Budget"] > 0, 0)
+        # Determine color for progress bar
+        summary_df["Color"] = pd.cut(
+            summary_df["Progress"],
+            [-float("inf"), 70, 100, float("inf")],
+            right=False,
+            labels=["green", "orange", "red"]
+        )
+
+        for row in summary_df.itertuples():
+            category = row.Index
+            st.markdown(f"#### {category}")
             col1, col2, col3, col4 = st.columns(4)
-            col1.metric("Budget", row["Budget"])
-            col2.metric("Spent", row["Spent"])
-            col3.metric("Remaining", row["Remaining"])
-            col4.metric("Utilization", row["Utilization"])
+            col1.metric("Budget", f"Rs {row.Budget / 100:,.2f}")
+            col2.metric("Spent", f"Rs {row.Spent / 100:,.2f}")
+            col3.metric("Remaining", f"Rs {row.Remaining / 100:,.2f}")
+            col4.metric("Utilization", f"{row.Progress:.2f}%")
             
-            st.progress(min(100, int(row["Progress"])))
+            st.progress(min(100, int(row.Progress)))
             st.markdown(
-                f'<style> .stProgress > div > div > div > div {{ background-color: {row["Color"]}; }} </style>', 
+                f'<style> .stProgress > div > div > div > div {{ background-color: {row.Color}; }} </style>', 
                 unsafe_allow_html=True
             )
             
-            if row["Progress"] >= 100:
-                st.warning(f"⚠️ {row['Category']} is over budget!")
+            if row.Progress >= 100:
+                st.warning(f"⚠️ {category} is over budget!")
             st.markdown("---")
 
     else:
@@ -226,10 +187,10 @@ def data_management_page():
 
     st.subheader("Export Transactions to CSV")
     transactions_df = utils.get_transactions_df()
-    csv_data = utils.get_transactions_as_csv(transactions_df)
     st.download_button(
         label="Download Transactions as CSV",
-        data=csv_data,
+        # Built only when the button is clicked, not on every rerun of the page
+        data=lambda: utils.get_transactions_as_csv(transactions_df),
         file_name="transactions.csv",
         mime="text/csv",
     )
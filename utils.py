@@ -1,3 +1,5 @@
+import csv
+import io
 import pandas as pd
 from datetime import datetime
 import os
@@ -5,20 +7,53 @@ import streamlit as st
 
 TRANSACTIONS_FILE = "database/transactions.txt"
 BUDGETS_FILE = "database/budgets.txt"
+TRANSACTIONS_HEADER = "Date,Type,Category,Amount,Description\n"
+
+# Set once the database files are known to exist, so the check runs once per process
+_database_files_ready = False
 
 def ensure_database_files_exist():
     """Ensures that the transactions.txt and budgets.txt files exist and have headers."""
+    global _database_files_ready
+    if _database_files_ready:
+        return
     os.makedirs(os.path.dirname(TRANSACTIONS_FILE), exist_ok=True)
     
-    # Ensure transactions.txt exists and has a header
-    if not os.path.exists(TRANSACTIONS_FILE) or os.path.getsize(TRANSACTIONS_FILE) == 0:
-        with open(TRANSACTIONS_FILE, "w") as f:
-            f.write("Date,Type,Category,Amount,Description\n") # Header for transactions
-    
-    # Ensure budgets.txt exists and has a header
-    if not os.path.exists(BUDGETS_FILE) or os.path.getsize(BUDGETS_FILE) == 0:
-        with open(BUDGETS_FILE, "w") as f:
-            f.write("Category,Budget\n") # Header for budgets
+    _create_with_header(TRANSACTIONS_FILE, TRANSACTIONS_HEADER)
+    _create_with_header(BUDGETS_FILE, "Category,Budget\n") # Header for budgets
+    _database_files_ready = True
+
+def _create_with_header(path, header):
+    """
+    Creates path containing just header. Opening with 'x' checks and creates in one atomic
+    step; an existing file only gets the header if it is empty.
+    """
+    try:
+        with open(path, "x") as f:
+            f.write(header)
+    except FileExistsError:
+        if os.path.getsize(path) == 0:
+            with open(path, "w") as f:
+                f.write(header)
+
+def _file_version(path):
+    """
+    Returns (modification time, size) of path, identifying one version of the file's contents.
+    Any write to the file (an append from the CLI or this app, a restore, a validate or a hand
+    edit) changes it.
+    """
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+def _database_file_version(path):
+    """Returns _file_version(path), recreating the database files if path was deleted."""
+    global _database_files_ready
+    try:
+        return _file_version(path)
+    except FileNotFoundError:
+        _database_files_ready = False
+        ensure_database_files_exist()
+        return _file_version(path)
 
 def _load_transactions_from_file():
     """
@@ -33,11 +68,20 @@ def _load_transactions_from_file():
     - Warnings are logged for problematic rows without crashing the application.
     """
     ensure_database_files_exist()
+    # Taken before reading, so a write racing the read shows up as a newer version later
+    file_version = _file_version(TRANSACTIONS_FILE)
     
     expected_columns = ["Date", "Type", "Category", "Amount", "Description"]
     
     try:
-        df = pd.read_csv(TRANSACTIONS_FILE, on_bad_lines='skip', engine='python')
+        # The C parser with the text columns' dtypes given up front skips per-column type
+        # inference; Amount is left to inference because malformed rows are coerced below
+        df = pd.read_csv(
+            TRANSACTIONS_FILE,
+            on_bad_lines='skip',
+            engine='c',
+            dtype={'Date': str, 'Type': str, 'Category': str, 'Description': str}
+        )
     except pd.errors.EmptyDataError:
         # If the file is completely empty, return a correctly structured empty DataFrame
         return pd.DataFrame(columns=expected_columns)
@@ -53,121 +97,278 @@ def _load_transactions_from_file():
 
     # 2. Clean up 'Date' column
     original_rows = len(df)
-    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+    # Transactions share few distinct dates, so each unique string is parsed once and
+    # mapped back. An explicit ISO 8601 format takes pandas' C fast path instead of
+    # per-value inference; anything that isn't ISO 8601 is retried with the inferring parser
+    date_codes, unique_dates = pd.factorize(df['Date'])
+    parsed_dates = pd.Series(pd.to_datetime(unique_dates, format='ISO8601', errors='coerce'))
+    non_iso_mask = parsed_dates.isna().to_numpy()
+    if non_iso_mask.any():
+        parsed_dates[non_iso_mask] = pd.to_datetime(unique_dates[non_iso_mask], errors='coerce')
+    # Missing dates have code -1 and come back as NaT
+    df['Date'] = parsed_dates.array.take(date_codes, allow_fill=True)
     
-    # Identify and log rows with invalid dates before dropping them
-    invalid_date_rows = df[df['Date'].isna()]
-    if not invalid_date_rows.empty:
+    # Identify and log rows with invalid dates before dropping them; on a clean file
+    # the mask is checked without ever slicing the DataFrame
+    invalid_date_mask = df['Date'].isna()
+    if invalid_date_mask.any():
         st.warning("Warning: Found and removed rows with invalid or missing dates.")
         # To avoid cluttering the UI, you might only show a few examples
-        st.dataframe(invalid_date_rows.head())
-        
-    df.dropna(subset=['Date'], inplace=True)
+        st.dataframe(df.loc[invalid_date_mask].head())
+        df.dropna(subset=['Date'], inplace=True)
     
     if len(df) < original_rows:
         print(f"Log: Removed {original_rows - len(df)} rows due to invalid dates.")
 
 
     # 3. Clean up 'Amount' column
-    # Identify rows where 'Amount' is not a valid number before coercion
-    invalid_amount_mask = pd.to_numeric(df['Amount'], errors='coerce').isna()
-    problematic_rows = df[invalid_amount_mask]
-    
-    if not problematic_rows.empty:
-        st.warning("Warning: Found rows with invalid 'Amount'. These have been set to 0.")
-        st.dataframe(problematic_rows.head())
+    # When every amount is a whole number the C parser already produced integer paisa
+    # and there is nothing to clean; otherwise coerce the column once
+    if not pd.api.types.is_integer_dtype(df['Amount']):
+        # The NaNs the coercion produces mark the rows whose 'Amount' is not a valid number
+        amounts = pd.to_numeric(df['Amount'], errors='coerce')
+        invalid_amount_mask = amounts.isna()
+        
+        if invalid_amount_mask.any():
+            st.warning("Warning: Found rows with invalid 'Amount'. These have been set to 0.")
+            st.dataframe(df.loc[invalid_amount_mask].head())
 
-    df['Amount'] = pd.to_numeric(df['Amount'], errors='coerce').fillna(0).astype(int)
+        df['Amount'] = amounts.fillna(0).astype(int)
 
     # 4. Clean up 'Type', 'Category', and 'Description'
-    for col in ['Type', 'Category', 'Description']:
-        # Ensure column is of string type to handle potential float inputs gracefully
-        df[col] = df[col].astype(str).fillna('')
-        if col == 'Type':
-            # Standardize the 'Type' column to title case (e.g., 'income' -> 'Income')
-            df[col] = df[col].str.title()
+    # Missing values are filled before the cast, so they become '' rather than the text 'nan'.
+    # The columns were already read as strings, so the cast only matters for a column
+    # reindex() had to add.
+    text_columns = ['Type', 'Category', 'Description']
+    df[text_columns] = df[text_columns].fillna('').astype(str)
+    # Standardize the 'Type' column to title case (e.g., 'income' -> 'Income').
+    # There are only a few distinct spellings, so each is title-cased once and mapped
+    # back with a hash lookup instead of title-casing every row
+    type_spellings = df['Type'].unique()
+    # (the cast keeps an empty column as strings; map() would make it float)
+    df['Type'] = df['Type'].map(dict(zip(type_spellings, (t.title() for t in type_spellings)))).astype(str)
+    # Type and Category repeat a handful of values, so they are stored as categoricals:
+    # small integer codes instead of a string per row, which also makes the
+    # comparisons and groupbys on them work on the codes. The categories come from the
+    # data, so values outside the predefined lists are kept
+    df[['Type', 'Category']] = df[['Type', 'Category']].astype('category')
 
     # Reset index after dropping rows
     df.reset_index(drop=True, inplace=True)
+
+    # Records which version of the file this DataFrame holds; the cached aggregates below are
+    # keyed on it, so they are recomputed whenever the file is rewritten, not just appended to
+    df.attrs["file_version"] = file_version
     
     return df
 
+@st.cache_data(show_spinner=False, max_entries=1)
+def _load_transactions_cached(path, file_version):
+    """
+    Parses the transactions file once per version of the file.
+    path and file_version are only the cache key, so a write to the file triggers a fresh
+    parse while every session and rerun in between reuses the cached DataFrame.
+    """
+    return _load_transactions_from_file()
+
 def _load_budgets_from_file():
-    """Loads budgets from budgets.txt into a pandas DataFrame."""
+    """
+    Loads budgets from budgets.txt into a pandas DataFrame indexed by Category,
+    so a category's budget is a hash lookup rather than a column scan.
+    """
     ensure_database_files_exist()
     try:
-        df = pd.read_csv(BUDGETS_FILE)
+        df = pd.read_csv(BUDGETS_FILE, index_col="Category")
         # Ensure 'Budget' column is numeric
         df["Budget"] = pd.to_numeric(df["Budget"], errors='coerce').fillna(0).astype(int)
         return df
     except pd.errors.EmptyDataError:
-        return pd.DataFrame(columns=["Category", "Budget"])
+        return pd.DataFrame(columns=["Category", "Budget"]).set_index("Category")
     except Exception as e:
         st.error(f"Error loading budgets from file: {e}. Returning empty DataFrame with expected columns.")
-        return pd.DataFrame(columns=["Category", "Budget"])
+        return pd.DataFrame(columns=["Category", "Budget"]).set_index("Category")
+
+@st.cache_data(show_spinner=False, max_entries=1)
+def _load_budgets_cached(path, file_version):
+    """Parses the budgets file once per version of the file, like _load_transactions_cached."""
+    return _load_budgets_from_file()
+
+def _ensure_transactions():
+    """
+    Loads the transactions DataFrame into Streamlit's session state if it is missing,
+    or reloads it when the file has changed on disk, e.g. when the CLI writes to it.
+    """
+    ensure_database_files_exist()
+    transactions_version = _database_file_version(TRANSACTIONS_FILE)
+    if st.session_state.get("transactions_version") != transactions_version:
+        st.session_state.transactions_df = _load_transactions_cached(TRANSACTIONS_FILE, transactions_version)
+        st.session_state.transactions_version = transactions_version
 
-def init_session_state_data():
-    """Initializes transactions and budgets DataFrames in Streamlit's session state."""
-    if "transactions_df" not in st.session_state:
-        st.session_state.transactions_df = _load_transactions_from_file()
-    if "budgets_df" not in st.session_state:
-        st.session_state.budgets_df = _load_budgets_from_file()
+def _ensure_budgets():
+    """Loads or reloads the budgets DataFrame in session state, like _ensure_transactions."""
+    ensure_database_files_exist()
+    budgets_version = _database_file_version(BUDGETS_FILE)
+    if st.session_state.get("budgets_version") != budgets_version:
+        st.session_state.budgets_df = _load_budgets_cached(BUDGETS_FILE, budgets_version)
+        st.session_state.budgets_version = budgets_version
 
 def get_transactions_df():
-    """Returns the transactions DataFrame from session state."""
-    init_session_state_data()
+    """Returns the transactions DataFrame from session state, loading only transactions."""
+    _ensure_transactions()
     return st.session_state.transactions_df
 
 def get_budgets_df():
-    """Returns the budgets DataFrame from session state."""
-    init_session_state_data()
+    """Returns the budgets DataFrame from session state, loading only budgets."""
+    _ensure_budgets()
     return st.session_state.budgets_df
 
+def _append_transaction_row(row):
+    """
+    Appends one CSV row to the transactions file and flushes it to disk.
+    csv.writer quotes descriptions containing commas. If the file doesn't end with a
+    newline (e.g. after a hand edit), one is added first so the row starts on its own line,
+    and an empty file gets the header first.
+    """
+    line = io.StringIO()
+    csv.writer(line, lineterminator="\n").writerow(row)
+    data = line.getvalue().encode()
+    # In "a+b" mode reads may seek anywhere, while writes always go to the end of the file
+    with open(TRANSACTIONS_FILE, "a+b") as f:
+        size = f.seek(0, os.SEEK_END)
+        if size:
+            f.seek(size - 1)
+            if f.read(1) != b"\n":
+                data = b"\n" + data
+        else:
+            data = TRANSACTIONS_HEADER.encode() + data
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
 def save_transaction(date, type, category, amount, description):
-    """Adds a new transaction to the session state DataFrame and saves it to file."""
+    """Adds a new transaction to the session state DataFrame and appends it to file."""
     # Convert date to pandas Timestamp to ensure consistent datetime type
     date = pd.to_datetime(date)
-    new_transaction = pd.DataFrame([{
-        "Date": date,
-        "Type": type,
-        "Category": category,
-        "Amount": amount,
-        "Description": description
-    }])
-    st.session_state.transactions_df = pd.concat([st.session_state.transactions_df, new_transaction], ignore_index=True)
-    st.session_state.transactions_df.to_csv(TRANSACTIONS_FILE, index=False)
+    # The session DataFrame must be current before a row is added to it
+    _ensure_transactions()
+    # Append one row instead of rewriting the whole file.
+    # Dates are always written as ISO 8601 'YYYY-MM-DD', so rows saved here are parsed by
+    # the loader's ISO fast path and never reach its inferring fallback
+    _append_transaction_row([date.strftime("%Y-%m-%d"), type, category, amount, description])
+    # Grow the session DataFrame in place rather than copying it with concat.
+    # A categorical column only accepts known values, so new ones are registered first
+    transactions_df = st.session_state.transactions_df
+    for column, value in (("Type", type), ("Category", category)):
+        values = transactions_df[column]
+        if isinstance(values.dtype, pd.CategoricalDtype) and value not in values.cat.categories:
+            transactions_df[column] = values.cat.add_categories([value])
+    transactions_df.loc[len(transactions_df)] = [date, type, category, amount, description]
+    # Enlarging an empty DataFrame drops the categorical dtype, so restore it
+    if not isinstance(transactions_df["Type"].dtype, pd.CategoricalDtype):
+        transactions_df[["Type", "Category"]] = transactions_df[["Type", "Category"]].astype("category")
+    # The session DataFrame already matches the file, so don't reparse it; it now holds
+    # the new version of the file, which also moves the cached aggregates on
+    transactions_version = _file_version(TRANSACTIONS_FILE)
+    transactions_df.attrs["file_version"] = transactions_version
+    st.session_state.transactions_version = transactions_version
 
 def save_budget(category, budget_amount):
     """Saves or updates a budget to the session state DataFrame and saves it to file."""
-    budgets_df = st.session_state.budgets_df
-    if category in budgets_df["Category"].values:
-        budgets_df.loc[budgets_df["Category"] == category, "Budget"] = budget_amount
-    else:
-        new_budget = pd.DataFrame([{"Category": category, "Budget": budget_amount}])
-        budgets_df = pd.concat([budgets_df, new_budget], ignore_index=True)
-    st.session_state.budgets_df = budgets_df
-    st.session_state.budgets_df.to_csv(BUDGETS_FILE, index=False)
+    budgets_df = get_budgets_df()
+    # Updates the category's row, or appends one if the category has no budget yet
+    # (a whole-row assignment, which unlike .loc[category, "Budget"] keeps the column int64)
+    budgets_df.loc[category] = int(budget_amount)
+    # The Category index is written out as the first column
+    budgets_df.to_csv(BUDGETS_FILE)
+    # The session DataFrame already matches the file, so don't reparse it
+    st.session_state.budgets_version = _file_version(BUDGETS_FILE)
+
+# Fixed category lists, built once at import; tuples so callers can't modify the shared values
+_TRANSACTION_CATEGORIES = ("Food", "Transport", "Shopping", "Bills", "Entertainment", "Health", "Other")
+_INCOME_SOURCES = ("Salary", "Freelance", "Business", "Investment", "Gift", "Other")
+_ALL_CATEGORIES = tuple(sorted(set(_TRANSACTION_CATEGORIES + _INCOME_SOURCES)))
 
 def get_transaction_categories():
-    """Returns a list of predefined transaction categories."""
-    return ["Food", "Transport", "Shopping", "Bills", "Entertainment", "Health", "Other"]
+    """Returns the predefined transaction categories."""
+    return _TRANSACTION_CATEGORIES
 
 def get_income_sources():
-    """Returns a list of predefined income sources."""
-    return ["Salary", "Freelance", "Business", "Investment", "Gift", "Other"]
+    """Returns the predefined income sources."""
+    return _INCOME_SOURCES
 
 def get_all_categories():
     """Returns all possible categories for budgets (union of transaction categories and income sources)."""
-    return sorted(list(set(get_transaction_categories() + get_income_sources())))
+    return _ALL_CATEGORIES
+
+def _transactions_cache_key(df):
+    """
+    Returns the version key for a transactions DataFrame, for the cached aggregates below:
+    the file version it was loaded from, kept current by save_transaction.
+    None for a DataFrame that didn't come from the file, which is then never cached.
+    """
+    return df.attrs.get("file_version")
+
+def _monthly_aggregates(df):
+    """
+    Returns total Amount per (Month, Type, Category). Every summary below is derived from
+    this one groupby, which is computed once per version of the transactions.
+    Month is an integer month ordinal (see _month_ordinals), not a Period.
+    """
+    cache_key = _transactions_cache_key(df)
+    if cache_key is None:
+        return _compute_monthly_aggregates(df)
+    return _monthly_aggregates_cached(df, cache_key)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _monthly_aggregates_cached(_df, cache_key):
+    """Cached body of _monthly_aggregates; cache_key stands in for the unhashed DataFrame."""
+    return _compute_monthly_aggregates(_df)
+
+def _compute_monthly_aggregates(df):
+    """Uncached body of _monthly_aggregates."""
+    return df.groupby([_month_ordinals(df["Date"]), "Type", "Category"], observed=True)["Amount"].sum()
+
+def _month_ordinals(dates):
+    """
+    Returns each date's month as an integer, the same ordinal a monthly Period uses.
+    Grouping and comparing these plain integers avoids building a PeriodArray.
+    """
+    dates = dates.dt
+    return ((dates.year - 1970) * 12 + dates.month - 1).rename("Month")
+
+def _current_month_ordinal():
+    """Returns the current month's ordinal, comparable with _month_ordinals."""
+    return pd.Timestamp.now().to_period("M").ordinal
+
+def _current_month_totals(monthly_aggregates, type, current_month):
+    """Returns current_month's per-category totals for one transaction type."""
+    index = monthly_aggregates.index
+    selected = monthly_aggregates[
+        (index.get_level_values("Month") == current_month) & (index.get_level_values("Type") == type)
+    ]
+    return selected.droplevel(["Month", "Type"])
 
 def get_monthly_summary(df):
     """Calculates monthly income, expenses, and balance for the current month."""
     if df.empty or 'Date' not in df.columns or 'Amount' not in df.columns:
         return 0, 0, 0
-    current_month_transactions = df[df["Date"].dt.to_period("M") == pd.Timestamp.now().to_period("M")]
+    # Cached, so calculate_savings_rate and the dashboard share one computation per data version
+    cache_key = _transactions_cache_key(df)
+    if cache_key is None:
+        return _compute_monthly_summary(df, _current_month_ordinal())
+    return _monthly_summary_cached(df, cache_key, _current_month_ordinal())
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _monthly_summary_cached(_df, cache_key, current_month):
+    """Cached body of get_monthly_summary; cache_key stands in for the unhashed DataFrame."""
+    return _compute_monthly_summary(_df, current_month)
+
+def _compute_monthly_summary(df, current_month):
+    """Uncached body of get_monthly_summary."""
+    monthly_aggregates = _monthly_aggregates(df)
     
-    total_income = current_month_transactions[current_month_transactions["Type"] == "Income"]["Amount"].sum()
-    total_expenses = current_month_transactions[current_month_transactions["Type"] == "Expense"]["Amount"].sum()
+    total_income = _current_month_totals(monthly_aggregates, "Income", current_month).sum()
+    total_expenses = _current_month_totals(monthly_aggregates, "Expense", current_month).sum()
     
     balance = total_income - total_expenses
     return total_income, total_expenses, balance
@@ -176,26 +377,21 @@ def get_spending_by_category(df):
     """Calculates spending by category for the current month."""
     if df.empty or 'Date' not in df.columns or 'Amount' not in df.columns:
         return pd.Series(dtype=float)
-    current_month_transactions = df[(df["Date"].dt.to_period("M") == pd.Timestamp.now().to_period("M")) & (df["Type"] == "Expense")]
-    return current_month_transactions.groupby("Category")["Amount"].sum().sort_values(ascending=False)
+    return _current_month_totals(_monthly_aggregates(df), "Expense", _current_month_ordinal()).sort_values(ascending=False)
 
 def get_spent_by_category(transactions_df):
     """Calculates the total amount spent for each category in the current month."""
     if transactions_df.empty or 'Date' not in transactions_df.columns or 'Amount' not in transactions_df.columns:
         return {}
-    current_month = pd.Timestamp.now().to_period("M")
-    spent_df = transactions_df[(transactions_df["Type"] == "Expense") & 
-                               (transactions_df["Date"].dt.to_period("M") == current_month)]
-    return spent_df.groupby("Category")["Amount"].sum().to_dict()
+    return _current_month_totals(_monthly_aggregates(transactions_df), "Expense", _current_month_ordinal()).to_dict()
 
 def get_monthly_spending_income(df):
     """Calculates total spending and income for each month."""
     if df.empty or 'Date' not in df.columns or 'Amount' not in df.columns:
         return pd.DataFrame(columns=["Spending", "Income"])
-    # Ensure 'Month' column is created before grouping
-    temp_df = df.copy()
-    temp_df["Month"] = temp_df["Date"].dt.to_period("M")
-    monthly_data = temp_df.groupby(["Month", "Type"])["Amount"].sum().unstack(fill_value=0)
+    monthly_data = _monthly_aggregates(df).groupby(level=["Month", "Type"]).sum().unstack(fill_value=0)
+    # Months are only turned into Periods here, for display
+    monthly_data.index = pd.PeriodIndex.from_ordinals(monthly_data.index, freq="M", name="Month")
     monthly_data["Spending"] = monthly_data.get("Expense", 0)
     monthly_data["Income"] = monthly_data.get("Income", 0)
     return monthly_data[["Spending", "Income"]]
@@ -212,16 +408,28 @@ def get_spending_breakdown(df):
     """Returns a breakdown of spending by category for the current month."""
     if df.empty or 'Date' not in df.columns or 'Amount' not in df.columns:
         return pd.Series(dtype=float)
-    current_month_transactions = df[(df["Date"].dt.to_period("M") == pd.Timestamp.now().to_period("M")) & (df["Type"] == "Expense")]
-    total_spending = current_month_transactions["Amount"].sum()
+    spending = _current_month_totals(_monthly_aggregates(df), "Expense", _current_month_ordinal())
+    total_spending = spending.sum()
     if total_spending == 0:
         return pd.Series(dtype=float)
     
-    breakdown = current_month_transactions.groupby("Category")["Amount"].sum()
-    return (breakdown / total_spending * 100).sort_values(ascending=False)
+    return (spending / total_spending * 100).sort_values(ascending=False)
+
+# Rows converted and serialized at a time when exporting transactions
+CSV_EXPORT_CHUNK_SIZE = 10_000
+
+def iter_transactions_csv(transactions_df, chunksize=CSV_EXPORT_CHUNK_SIZE):
+    """
+    Yields all transactions as CSV text, one chunk of rows at a time, so only one chunk's
+    converted amounts and text are held at once. The first chunk carries the header.
+    """
+    # An empty frame still yields the header row
+    for start in range(0, max(len(transactions_df), 1), chunksize):
+        chunk = transactions_df.iloc[start:start + chunksize]
+        # Only the Amount column is replaced (converted back to Rs for export); the
+        # other columns are shared with transactions_df rather than copied
+        yield chunk.assign(Amount=chunk["Amount"] / 100).to_csv(index=False, header=start == 0)
 
 def get_transactions_as_csv(transactions_df):
     """Returns all transactions as a CSV string."""
-    df_copy = transactions_df.copy()
-    df_copy["Amount"] = df_copy["Amount"] / 100 # Convert back to Rs for export
-    return df_copy.to_csv(index=False)
\ No newline at end of file
+    return "".join(iter_transactions_csv(transactions_df))
\ No newline at end of file